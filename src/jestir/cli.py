@@ -2085,17 +2085,17 @@ def debug_template(ctx, template_path, context, analyze, performance, compare):
                 click.echo("-" * 30)
                 metrics = analysis.performance_metrics
                 click.echo(
-                    f"Template Size: {metrics.get('template_size_bytes', 0):,} bytes",
+                    f"Template Size: {metrics.template_size_bytes:,} bytes",
                 )
-                click.echo(f"Line Count: {metrics.get('line_count', 0)}")
+                click.echo(f"Line Count: {metrics.line_count}")
                 click.echo(
-                    f"Documentation Coverage: {metrics.get('documentation_coverage', 0):.1%}",
+                    f"Documentation Coverage: {metrics.documentation_coverage:.1%}",
                 )
                 click.echo(
-                    f"Repeated Variables: {metrics.get('repeated_variables', 0)}",
+                    f"Repeated Variables: {metrics.repeated_variables}",
                 )
                 click.echo(
-                    f"Est. Rendering Time: {metrics.get('estimated_rendering_time_ms', 0):.1f}ms",
+                    f"Est. Rendering Time: {metrics.estimated_rendering_time_ms:.1f}ms",
                 )
 
             # Potential issues
@@ -34,9 +34,9 @@ class CreativeAPIConfig(BaseModel):
         default="gpt-4o",
         description="Model to use for creative generation",
     )
-    max_tokens: int = Field(
+    max_tokens: int | None = Field(
         default=4000,
-        description="Maximum tokens for creative requests",
+        description="Maximum tokens for creative requests (None lets the model stop on its own)",
     )
     temperature: float = Field(
         default=0.8,
@@ -60,3 +60,7 @@ class LightRAGAPIConfig(BaseModel):
         default=False,
         description="Enable mock mode for testing without API",
     )
+    speculative_details: bool = Field(
+        default=False,
+        description="Issue entity detail queries alongside the existence check",
+    )
@@ -25,6 +25,14 @@ class TokenUsage(BaseModel):
         description="Number of tokens in the completion",
     )
     total_tokens: int = Field(..., description="Total tokens used")
+    cached_tokens: int = Field(
+        default=0,
+        description="Prompt tokens served from the provider's prompt cache",
+    )
+    cache_write_tokens: int = Field(
+        default=0,
+        description="Prompt tokens written to the provider's prompt cache",
+    )
     cost_usd: float = Field(..., description="Cost in USD")
     input_text_length: int = Field(default=0, description="Length of input text")
     output_text_length: int = Field(default=0, description="Length of output text")
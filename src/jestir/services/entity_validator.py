@@ -3,8 +3,11 @@
 import logging
 from dataclasses import dataclass
 from difflib import SequenceMatcher
+from typing import TYPE_CHECKING
 
-from .lightrag_client import LightRAGEntity
+if TYPE_CHECKING:
+    # Annotation-only import: lightrag_client imports this module at load time
+    from .lightrag_client import LightRAGEntity
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +16,7 @@ logger = logging.getLogger(__name__)
 class EntityMatchResult:
     """Result of entity matching with confidence scoring."""
 
-    entity: LightRAGEntity
+    entity: "LightRAGEntity"
     confidence: float
     similarity_score: float
     is_exact_match: bool
@@ -45,7 +48,7 @@ class EntityValidator:
     def validate_entity_match(
         self,
         search_query: str,
-        lightrag_entity: LightRAGEntity,
+        lightrag_entity: "LightRAGEntity",
         entity_type: str | None = None,
     ) -> EntityMatchResult:
         """
@@ -65,6 +68,55 @@ class EntityValidator:
             lightrag_entity.name,
         )
 
+        return self._build_match_result(
+            search_query,
+            lightrag_entity,
+            similarity_score,
+            entity_type,
+        )
+
+    def validate_entity_matches(
+        self,
+        search_query: str,
+        lightrag_entities: "list[LightRAGEntity]",
+        entity_type: str | None = None,
+    ) -> list[EntityMatchResult]:
+        """
+        Validate and score several LightRAG entities against one search query.
+
+        The query is normalized once and shared by every comparison.
+
+        Args:
+            search_query: Original search query
+            lightrag_entities: Entities found by LightRAG
+            entity_type: Expected entity type (optional)
+
+        Returns:
+            EntityMatchResult for each entity, in input order
+        """
+        query_norm = search_query.lower().strip()
+
+        return [
+            self._build_match_result(
+                search_query,
+                lightrag_entity,
+                self._normalized_similarity(
+                    query_norm,
+                    lightrag_entity.name.lower().strip(),
+                ),
+                entity_type,
+            )
+            for lightrag_entity in lightrag_entities
+        ]
+
+    def _build_match_result(
+        self,
+        search_query: str,
+        lightrag_entity: "LightRAGEntity",
+        similarity_score: float,
+        entity_type: str | None,
+    ) -> EntityMatchResult:
+        """Score a match from its precomputed name similarity."""
         # Check for exact match
         is_exact_match = similarity_score >= self.exact_match_threshold
 
@@ -100,16 +152,20 @@ class EntityValidator:
     def _calculate_similarity(self, query: str, entity_name: str) -> float:
         """Calculate string similarity between query and entity name."""
         # Normalize strings for comparison
-        query_norm = query.lower().strip()
-        entity_norm = entity_name.lower().strip()
-
-        # Use SequenceMatcher for similarity
-        similarity = SequenceMatcher(None, query_norm, entity_norm).ratio()
+        return self._normalized_similarity(
+            query.lower().strip(),
+            entity_name.lower().strip(),
+        )
 
-        # Boost score for exact matches (case-insensitive)
+    def _normalized_similarity(self, query_norm: str, entity_norm: str) -> float:
+        """Calculate similarity between already normalized strings."""
+        # Exact matches (case-insensitive) need no sequence comparison
         if query_norm == entity_norm:
             return 1.0
 
+        # Use SequenceMatcher for similarity
+        similarity = SequenceMatcher(None, query_norm, entity_norm).ratio()
+
         # Boost score for substring matches
         if query_norm in entity_norm or entity_norm in query_norm:
             similarity = max(similarity, 0.7)
@@ -119,7 +175,7 @@ class EntityValidator:
     def _calculate_confidence(
         self,
         search_query: str,
-        lightrag_entity: LightRAGEntity,
+        lightrag_entity: "LightRAGEntity",
         similarity_score: float,
         entity_type: str | None,
     ) -> float:
@@ -146,7 +202,7 @@ class EntityValidator:
     def _generate_match_reason(
         self,
         search_query: str,
-        lightrag_entity: LightRAGEntity,
+        lightrag_entity: "LightRAGEntity",
         similarity_score: float,
         confidence: float,
         is_exact_match: bool,
@@ -1,20 +1,96 @@
 """LightRAG API client for entity retrieval and search."""
 
+import asyncio
+import copy
+import importlib.util
 import json
 import logging
 import re
-from collections.abc import Callable
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
-from typing import Any
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import httpx
 import yaml
 
 from ..models.api_config import LightRAGAPIConfig
 from ..utils.lightrag_config import load_lightrag_config
+from .entity_validator import EntityValidator
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+try:
+    import orjson
+
+    _json_loads: Callable[[str], Any] = orjson.loads
+    _json_dumps: Callable[[Any], bytes] = orjson.dumps
+except ImportError:
+    # orjson is an optional speedup; its decode errors subclass JSONDecodeError
+    _json_loads = json.loads
+
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
 
 logger = logging.getLogger(__name__)
 
+# Key and value types of the in-process LRU caches
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+# Connection pool sizing shared by every request issued through one client
+_CONNECTION_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# HTTP/2 multiplexing needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Fixed request fields, merged with the per-call fields of each payload
+_STREAM_PAYLOAD_DEFAULTS = {"response_type": "JSON", "stream": True}
+_ENTITY_DETAILS_PAYLOAD_DEFAULTS = {
+    "mode": "local",
+    "response_type": "JSON",
+    "top_k": 5,
+}
+
+# Bounds for the in-process response caches
+_CACHE_MAX_SIZE = 256
+_ENTITY_TYPES_TTL_SECONDS = 60.0
+
+# Patterns used to recover entities from loosely structured responses
+_YAML_ENTITIES_RE = re.compile(r"entities:.*?(?=\n\w+:|$)", re.IGNORECASE | re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+_ENTITY_LABEL_RE = re.compile(
+    r"(?P<label>Character|Person|Location|Place|Item|Object|Event|Organization)"
+    r"s?:?\s*(?P<name>[^\n,]+)",
+    re.IGNORECASE,
+)
+_ENTITY_LABEL_TYPES = {
+    "character": "character",
+    "person": "character",
+    "location": "location",
+    "place": "location",
+    "item": "item",
+    "object": "item",
+    "event": "event",
+    "organization": "organization",
+}
+
+_ERROR_MESSAGES = {
+    400: "Bad Request - Invalid query parameters",
+    401: "Unauthorized - Invalid or missing API key",
+    403: "Forbidden - Access denied",
+    404: "Not Found - Endpoint or resource not found",
+    429: "Too Many Requests - Rate limit exceeded",
+    500: "Internal Server Error - Server encountered an error",
+    502: "Bad Gateway - Server is temporarily unavailable",
+    503: "Service Unavailable - Server is overloaded",
+    504: "Gateway Timeout - Server took too long to respond",
+}
+
 
 @dataclass
 class LightRAGEntity:
@@ -53,6 +129,55 @@ class LightRAGHealthStatus:
     api_version: str | None = None
 
 
+# Canned responses served when the client runs in mock mode
+_MOCK_ENTITIES: dict[str, LightRAGEntity] = {
+    "lily": LightRAGEntity(
+        name="Lily",
+        entity_type="character",
+        description="A curious and brave 8-year-old girl who loves adventures",
+        properties={
+            "age": 8,
+            "personality": "curious and brave",
+            "role": "protagonist",
+        },
+    ),
+    "purple dragon": LightRAGEntity(
+        name="Purple Dragon",
+        entity_type="character",
+        description="A friendly purple dragon who lives in the magic forest",
+        properties={
+            "color": "purple",
+            "personality": "friendly",
+            "habitat": "magic forest",
+        },
+    ),
+    "magic forest": LightRAGEntity(
+        name="Magic Forest",
+        entity_type="location",
+        description="A mystical forest filled with magical creatures and wonders",
+        properties={
+            "type": "magical",
+            "accessibility": "public",
+            "danger_level": "low",
+        },
+    ),
+}
+
+_MOCK_HEALTH_STATUS = LightRAGHealthStatus(
+    status="healthy",
+    working_directory="./rag_storage",
+    input_directory="./inputs",
+    configuration={
+        "llm_binding": "mock",
+        "embedding_binding": "mock",
+        "workspace": "test",
+    },
+    pipeline_busy=False,
+    core_version="1.0.0-mock",
+    api_version="1.0.0-mock",
+)
+
+
 class LightRAGClient:
     """Client for interacting with LightRAG API for entity retrieval."""
 
@@ -61,6 +186,32 @@ class LightRAGClient:
         self.config = config or self._load_config_from_env()
         self.base_url = self.config.base_url.rstrip("/")
         self.timeout = self.config.timeout
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._search_cache: OrderedDict[tuple[Any, ...], LightRAGSearchResult] = (
+            OrderedDict()
+        )
+        self._entity_cache: OrderedDict[str, LightRAGEntity] = OrderedDict()
+        self._entity_types_cache: tuple[float, list[str]] | None = None
+
+    async def __aenter__(self) -> "Self":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    def clear_cache(self) -> None:
+        """Clear the cached search, entity and entity type responses."""
+        self._search_cache.clear()
+        self._entity_cache.clear()
+        self._entity_types_cache = None
 
     def _load_config_from_env(self) -> LightRAGAPIConfig:
         """Load configuration from environment variables."""
@@ -124,55 +275,38 @@ class LightRAGClient:
         if user_prompt:
             payload["user_prompt"] = user_prompt
 
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = self._get_headers()
-                response = await client.post(
-                    f"{self.base_url}/query",
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                return self._parse_search_response(result, query, mode)
-
-        except httpx.ConnectError as e:
-            logger.warning(f"LightRAG connection failed: {e}")
-            return self._handle_error_fallback(
-                query,
-                entity_type,
+        # Conversation history is not hashable and makes repeats unlikely
+        cache_key = None
+        if not conversation_history:
+            cache_key = (
+                search_query,
                 mode,
                 top_k,
-                "connection_failed",
-            )
-        except httpx.TimeoutException as e:
-            logger.warning(f"LightRAG request timeout: {e}")
-            return self._handle_error_fallback(
-                query,
-                entity_type,
-                mode,
-                top_k,
-                "timeout",
-            )
-        except httpx.HTTPStatusError as e:
-            error_msg = self._get_http_error_message(e.response.status_code)
-            logger.warning(f"LightRAG HTTP error {e.response.status_code}: {error_msg}")
-            return self._handle_error_fallback(
-                query,
-                entity_type,
-                mode,
-                top_k,
-                f"http_{e.response.status_code}",
+                chunk_top_k,
+                max_total_tokens,
+                enable_rerank,
+                response_type,
+                user_prompt,
             )
+            cached = self._cache_get(self._search_cache, cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            result = await self._post("/query", payload)
+            search_result = self._parse_search_response(result, query, mode)
+            if cache_key is not None:
+                self._cache_put(self._search_cache, cache_key, search_result)
+            return search_result
+
         except Exception as e:
-            logger.warning(f"Unexpected LightRAG error: {e}")
+            error_type = self._handle_error_response(e, "LightRAG")
             return self._handle_error_fallback(
                 query,
                 entity_type,
                 mode,
                 top_k,
-                "unexpected_error",
+                error_type,
             )
 
     async def search_entities_stream(
@@ -216,14 +350,13 @@ class LightRAGClient:
 
         # Prepare request payload
         payload = {
+            **_STREAM_PAYLOAD_DEFAULTS,
             "query": search_query,
             "mode": mode,
             "top_k": top_k,
             "chunk_top_k": chunk_top_k,
             "max_total_tokens": max_total_tokens,
-            "response_type": "JSON",
             "enable_rerank": enable_rerank,
-            "stream": True,
         }
 
         # Add optional parameters
@@ -235,76 +368,43 @@ class LightRAGClient:
             payload["user_prompt"] = user_prompt
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = self._get_headers()
-                headers["Accept"] = "application/x-ndjson"
-
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/query/stream",
-                    json=payload,
-                    headers=headers,
-                ) as response:
-                    response.raise_for_status()
-
-                    full_response = ""
-                    async for line in response.aiter_lines():
-                        if line.strip():
-                            try:
-                                chunk_data = json.loads(line)
-                                if "response" in chunk_data:
-                                    chunk_text = chunk_data["response"]
-                                    full_response += chunk_text
-                                    if on_chunk:
-                                        on_chunk(chunk_text)
-                            except json.JSONDecodeError:
-                                continue
-
-                    # Parse the complete response
-                    return self._parse_search_response(
-                        {"response": full_response},
-                        query,
-                        mode,
-                    )
+            client = await self._get_client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/query/stream",
+                content=_json_dumps(payload),
+                headers={"Accept": "application/x-ndjson"},
+            ) as response:
+                response.raise_for_status()
 
-        except httpx.ConnectError as e:
-            logger.warning(f"LightRAG streaming connection failed: {e}")
-            return self._handle_error_fallback(
+                chunks: list[str] = []
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        try:
+                            chunk_data = _json_loads(line)
+                            if "response" in chunk_data:
+                                chunk_text = chunk_data["response"]
+                                chunks.append(chunk_text)
+                                if on_chunk:
+                                    on_chunk(chunk_text)
+                        except json.JSONDecodeError:
+                            continue
+
+            # Parse the complete response
+            return self._parse_search_response(
+                {"response": "".join(chunks)},
                 query,
-                entity_type,
                 mode,
-                top_k,
-                "connection_failed",
-            )
-        except httpx.TimeoutException as e:
-            logger.warning(f"LightRAG streaming timeout: {e}")
-            return self._handle_error_fallback(
-                query,
-                entity_type,
-                mode,
-                top_k,
-                "timeout",
-            )
-        except httpx.HTTPStatusError as e:
-            error_msg = self._get_http_error_message(e.response.status_code)
-            logger.warning(
-                f"LightRAG streaming HTTP error {e.response.status_code}: {error_msg}",
-            )
-            return self._handle_error_fallback(
-                query,
-                entity_type,
-                mode,
-                top_k,
-                f"http_{e.response.status_code}",
             )
+
         except Exception as e:
-            logger.warning(f"Unexpected LightRAG streaming error: {e}")
+            error_type = self._handle_error_response(e, "LightRAG streaming")
             return self._handle_error_fallback(
                 query,
                 entity_type,
                 mode,
                 top_k,
-                "unexpected_error",
+                error_type,
             )
 
     async def get_entity_details(self, entity_name: str) -> LightRAGEntity | None:
@@ -320,54 +420,61 @@ class LightRAGClient:
         if self.config.mock_mode:
             return self._mock_get_entity_details(entity_name)
 
+        cache_key = entity_name.lower()
+        cached = self._cache_get(self._entity_cache, cache_key)
+        if cached is not None:
+            return cached
+
+        # Get entity details via structured query
+        structured_query = self._build_entity_details_query(entity_name)
+        payload = {**_ENTITY_DETAILS_PAYLOAD_DEFAULTS, "query": structured_query}
+
+        query_task: asyncio.Task[Any] | None = None
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = self._get_headers()
+            if self.config.speculative_details:
+                # Overlap the details query with the existence check; it is
+                # discarded if the entity turns out not to exist
+                query_task = asyncio.create_task(self._post("/query", payload))
 
-                # Check if entity exists
-                exists_response = await client.get(
-                    f"{self.base_url}/graph/entity/exists",
+            # Check if entity exists
+            try:
+                exists_data = await self._get(
+                    "/graph/entity/exists",
                     params={"name": entity_name},
-                    headers=headers,
                 )
-
-                if not exists_response.json().get("exists", False):
+            except httpx.HTTPStatusError as e:
+                # A 404 here means the entity is unknown, not that the API failed
+                if e.response.status_code == 404:
                     return None
+                raise
 
-                # Get entity details via structured query
-                structured_query = self._build_entity_details_query(entity_name)
-                payload = {
-                    "query": structured_query,
-                    "mode": "local",
-                    "response_type": "JSON",
-                    "top_k": 5,
-                }
-
-                response = await client.post(
-                    f"{self.base_url}/query",
-                    json=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
+            if not exists_data.get("exists", False):
+                return None
 
-                logger.debug(f"LightRAG entity details response: {response.json()}")
+            if query_task is not None:
+                result = await query_task
+            else:
+                result = await self._post("/query", payload)
 
-                result = response.json()
-                return self._parse_entity_details(result, entity_name)
+            logger.debug(f"LightRAG entity details response: {result}")
+
+            entity = self._parse_entity_details(result, entity_name)
+            self._cache_put(self._entity_cache, cache_key, entity)
+            return entity
 
-        except httpx.ConnectError as e:
-            logger.warning(f"LightRAG connection failed: {e}")
-            return self._mock_get_entity_details(entity_name)
-        except httpx.TimeoutException as e:
-            logger.warning(f"LightRAG request timeout: {e}")
-            return self._mock_get_entity_details(entity_name)
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"LightRAG HTTP error {e.response.status_code}: {e}")
-            return self._mock_get_entity_details(entity_name)
         except Exception as e:
-            logger.warning(f"Unexpected LightRAG error: {e}")
+            self._handle_error_response(e, "LightRAG")
             return self._mock_get_entity_details(entity_name)
 
+        finally:
+            if query_task is not None and not query_task.done():
+                query_task.cancel()
+                # Retrieve the outcome so a late failure is not reported as
+                # an unhandled task exception
+                query_task.add_done_callback(
+                    lambda task: task.cancelled() or task.exception(),
+                )
+
     async def get_available_entity_types(self) -> list[str]:
         """
         Get list of available entity types from the knowledge graph.
@@ -378,33 +485,25 @@ class LightRAGClient:
         if self.config.mock_mode:
             return self._mock_get_entity_types()
 
+        # Labels change slowly, so reuse them for a short period
+        if self._entity_types_cache is not None:
+            cached_at, entity_types = self._entity_types_cache
+            if time.monotonic() - cached_at < _ENTITY_TYPES_TTL_SECONDS:
+                return list(entity_types)
+
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = self._get_headers()
-                response = await client.get(
-                    f"{self.base_url}/graph/label/list",
-                    headers=headers,
-                )
-                response.raise_for_status()
-                data = response.json()
-                if isinstance(data, list) and all(
-                    isinstance(item, str) for item in data
-                ):
-                    return data
+            data = await self._get("/graph/label/list")
+            if not isinstance(data, list):
                 logger.warning("Unexpected response format from LightRAG API")
                 return self._mock_get_entity_types()
 
-        except httpx.ConnectError as e:
-            logger.warning(f"LightRAG connection failed: {e}")
-            return self._mock_get_entity_types()
-        except httpx.TimeoutException as e:
-            logger.warning(f"LightRAG request timeout: {e}")
-            return self._mock_get_entity_types()
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"LightRAG HTTP error {e.response.status_code}: {e}")
-            return self._mock_get_entity_types()
+            # Keep the string labels in one pass rather than validating first
+            entity_types = [item for item in data if isinstance(item, str)]
+            self._entity_types_cache = (time.monotonic(), list(entity_types))
+            return entity_types
+
         except Exception as e:
-            logger.warning(f"Unexpected LightRAG error: {e}")
+            self._handle_error_response(e, "LightRAG")
             return self._mock_get_entity_types()
 
     async def fuzzy_search_entities(
@@ -424,62 +523,72 @@ class LightRAGClient:
         Returns:
             List of matching entities with confidence scoring
         """
-        # Try different search variations
-        search_variations = [
-            name,
-            name.lower(),
-            name.title(),
-            f"*{name}*",
-            f"{name}*",
-            f"*{name}",
-        ]
-
-        all_results = []
-        seen_names = set()
+        # Try different search variations, dropping case forms that collapse
+        # onto the same string so identical queries are only sent once
+        search_variations = list(
+            dict.fromkeys(
+                [
+                    name,
+                    name.lower(),
+                    name.title(),
+                    f"*{name}*",
+                    f"{name}*",
+                    f"*{name}",
+                ],
+            ),
+        )
 
-        for variation in search_variations:
-            try:
-                result = await self.search_entities(
+        # Variations are independent, so issue them concurrently
+        results = await asyncio.gather(
+            *[
+                self.search_entities(
                     variation,
                     entity_type=entity_type,
                     mode="local",
                     top_k=5,
                 )
+                for variation in search_variations
+            ],
+            return_exceptions=True,
+        )
 
-                for entity in result.entities:
-                    if entity.name.lower() not in seen_names:
-                        all_results.append(entity)
-                        seen_names.add(entity.name.lower())
+        all_results = []
+        seen_names = set()
 
-            except Exception:
+        for result in results:
+            if isinstance(result, BaseException):
                 continue
 
+            for entity in result.entities:
+                lname = entity.name.lower()
+                if lname not in seen_names:
+                    all_results.append(entity)
+                    seen_names.add(lname)
+
         # Validate and score matches if required
         if require_validation and all_results:
-            from .entity_validator import EntityValidator
-
             validator = EntityValidator()
 
             validated_results = []
-            for entity in all_results:
-                match_result = validator.validate_entity_match(
-                    name,
-                    entity,
-                    entity_type,
-                )
-
+            for match_result in validator.validate_entity_matches(
+                name,
+                all_results,
+                entity_type,
+            ):
                 # Add confidence and similarity scores to entity
+                entity = match_result.entity
                 entity.confidence = match_result.confidence
                 entity.similarity_score = match_result.similarity_score
 
                 validated_results.append(entity)
 
-            # Sort by confidence and similarity score
-            all_results = sorted(
-                validated_results,
-                key=lambda e: (e.confidence or 0, e.similarity_score or 0),
+            # Sort by confidence and similarity score; both were just set on
+            # every entity, so no None handling is needed in the key
+            validated_results.sort(
+                key=attrgetter("confidence", "similarity_score"),
                 reverse=True,
             )
+            all_results = validated_results
 
         return all_results
 
@@ -494,38 +603,19 @@ class LightRAGClient:
             return self._mock_health_status()
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = self._get_headers()
-                response = await client.get(
-                    f"{self.base_url}/health",
-                    headers=headers,
-                )
-                response.raise_for_status()
-
-                data = response.json()
-                return LightRAGHealthStatus(
-                    status=data.get("status", "unknown"),
-                    working_directory=data.get("working_directory", ""),
-                    input_directory=data.get("input_directory", ""),
-                    configuration=data.get("configuration", {}),
-                    pipeline_busy=data.get("pipeline_busy", False),
-                    core_version=data.get("core_version"),
-                    api_version=data.get("api_version"),
-                )
-
-        except httpx.ConnectError as e:
-            logger.warning(f"LightRAG health check failed: {e}")
-            return None
-        except httpx.TimeoutException as e:
-            logger.warning(f"LightRAG health check timeout: {e}")
-            return None
-        except httpx.HTTPStatusError as e:
-            logger.warning(
-                f"LightRAG health check HTTP error {e.response.status_code}: {e}",
+            data = await self._get("/health")
+            return LightRAGHealthStatus(
+                status=data.get("status", "unknown"),
+                working_directory=data.get("working_directory", ""),
+                input_directory=data.get("input_directory", ""),
+                configuration=data.get("configuration", {}),
+                pipeline_busy=data.get("pipeline_busy", False),
+                core_version=data.get("core_version"),
+                api_version=data.get("api_version"),
             )
-            return None
+
         except Exception as e:
-            logger.warning(f"Unexpected LightRAG health check error: {e}")
+            self._handle_error_response(e, "LightRAG health check")
             return None
 
     def _build_structured_query(
@@ -658,12 +748,7 @@ Return only the YAML object, no additional text or explanations."""
             # If full YAML parsing fails, try to extract YAML from the text
             try:
                 # Look for YAML entity patterns in the response
-                yaml_pattern = r"entities:.*?(?=\n\w+:|$)"
-                yaml_matches = re.findall(
-                    yaml_pattern,
-                    response_text,
-                    re.IGNORECASE | re.DOTALL,
-                )
+                yaml_matches = _YAML_ENTITIES_RE.findall(response_text)
 
                 for match in yaml_matches:
                     try:
@@ -706,6 +791,74 @@ Return only the YAML object, no additional text or explanations."""
             headers["X-API-Key"] = self.config.api_key
         return headers
 
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        # Pooled connections are bound to the loop that opened them; callers
+        # such as the CLI drive each request through a fresh asyncio.run()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=_CONNECTION_LIMITS,
+                http2=_HTTP2_AVAILABLE,
+                headers=self._get_headers(),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _get(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """Issue a GET request against the LightRAG API and decode the JSON body."""
+        client = await self._get_client()
+        response = await client.get(f"{self.base_url}{path}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _post(self, path: str, payload: dict[str, Any]) -> Any:
+        """Issue a POST request against the LightRAG API and decode the JSON body."""
+        client = await self._get_client()
+        # Content-Type is part of the pooled client's default headers
+        response = await client.post(
+            f"{self.base_url}{path}",
+            content=_json_dumps(payload),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _cache_get(self, cache: OrderedDict[_K, _V], key: _K) -> _V | None:
+        """Return a copy of a cached value and mark it as recently used."""
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        # Callers annotate returned entities (e.g. confidence scores) in place
+        return copy.deepcopy(cache[key])
+
+    def _cache_put(self, cache: OrderedDict[_K, _V], key: _K, value: _V) -> None:
+        """Store a copy of a value, evicting the least recently used entry."""
+        cache[key] = copy.deepcopy(value)
+        cache.move_to_end(key)
+        if len(cache) > _CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+
+    def _handle_error_response(self, error: Exception, operation: str) -> str:
+        """Log a failed LightRAG request and classify it for fallback handling."""
+        if isinstance(error, httpx.ConnectError):
+            logger.warning(f"{operation} connection failed: {error}")
+            return "connection_failed"
+        if isinstance(error, httpx.TimeoutException):
+            logger.warning(f"{operation} timeout: {error}")
+            return "timeout"
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            error_msg = self._get_http_error_message(status_code)
+            logger.warning(f"{operation} HTTP error {status_code}: {error_msg}")
+            return f"http_{status_code}"
+        logger.warning(f"Unexpected {operation} error: {error}")
+        return "unexpected_error"
+
     def _parse_search_response(
         self,
         response: dict[str, Any],
@@ -741,28 +894,23 @@ Return only the YAML object, no additional text or explanations."""
         query: str,
     ) -> list[LightRAGEntity]:
         """Extract entities from response text using pattern matching and JSON parsing."""
+        # Plain prose cannot hold a JSON entity, so skip straight to patterns
+        if "{" not in text or '"name"' not in text:
+            return self._extract_entities_by_patterns(text, query)
+
         entities = []
 
         # Try to parse JSON entities if the response contains structured data
         try:
-            # Look for JSON-like structures in the response
-            json_pattern = r'\{[^{}]*"name"[^{}]*\}'
-            json_matches = re.findall(json_pattern, text, re.IGNORECASE | re.DOTALL)
-
-            for match in json_matches:
-                try:
-                    entity_data = json.loads(match)
-                    if "name" in entity_data:
-                        entity = LightRAGEntity(
-                            name=entity_data.get("name", ""),
-                            entity_type=entity_data.get("type", "unknown"),
-                            description=entity_data.get("description"),
-                            properties=entity_data.get("properties", {}),
-                            relationships=entity_data.get("relationships", []),
-                        )
-                        entities.append(entity)
-                except json.JSONDecodeError:
-                    continue
+            for entity_data in self._iter_json_entity_data(text):
+                entity = LightRAGEntity(
+                    name=entity_data.get("name", ""),
+                    entity_type=entity_data.get("type", "unknown"),
+                    description=entity_data.get("description"),
+                    properties=entity_data.get("properties", {}),
+                    relationships=entity_data.get("relationships", []),
+                )
+                entities.append(entity)
         except Exception:
             pass
 
@@ -772,6 +920,40 @@ Return only the YAML object, no additional text or explanations."""
 
         return entities
 
+    def _iter_json_entity_data(self, text: str) -> Iterator[dict[str, Any]]:
+        """Yield every JSON object with a name field embedded in the text."""
+        # Fast path: the whole response is a JSON document
+        stripped = text.strip()
+        if stripped.startswith(("{", "[")):
+            try:
+                yield from self._collect_entity_data(_json_loads(stripped))
+                return
+            except json.JSONDecodeError:
+                pass
+
+        # Otherwise walk the text, decoding each JSON object in place
+        idx = text.find("{")
+        while idx != -1:
+            try:
+                value, end = _JSON_DECODER.raw_decode(text, idx)
+            except json.JSONDecodeError:
+                idx = text.find("{", idx + 1)
+                continue
+            yield from self._collect_entity_data(value)
+            idx = text.find("{", end)
+
+    def _collect_entity_data(self, value: Any) -> Iterator[dict[str, Any]]:
+        """Yield entity-like dicts from a decoded JSON value, descending into containers."""
+        if isinstance(value, dict):
+            if "name" in value:
+                yield value
+                return
+            for item in value.values():
+                yield from self._collect_entity_data(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from self._collect_entity_data(item)
+
     def _extract_entities_by_patterns(
         self,
         text: str,
@@ -780,30 +962,18 @@ Return only the YAML object, no additional text or explanations."""
         """Extract entities using pattern matching when JSON parsing fails."""
         entities = []
 
-        # Common entity patterns
-        patterns = [
-            (r"Character[s]?:?\s*([^\n,]+)", "character"),
-            (r"Person[s]?:?\s*([^\n,]+)", "character"),
-            (r"Location[s]?:?\s*([^\n,]+)", "location"),
-            (r"Place[s]?:?\s*([^\n,]+)", "location"),
-            (r"Item[s]?:?\s*([^\n,]+)", "item"),
-            (r"Object[s]?:?\s*([^\n,]+)", "item"),
-            (r"Event[s]?:?\s*([^\n,]+)", "event"),
-            (r"Organization[s]?:?\s*([^\n,]+)", "organization"),
-        ]
-
-        for pattern, entity_type in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                name = match.strip()
-                if name and len(name) > 1:  # Avoid single characters
-                    entity = LightRAGEntity(
-                        name=name,
-                        entity_type=entity_type,
-                        description=f"A {entity_type} mentioned in the response",
-                        properties={},
-                    )
-                    entities.append(entity)
+        # One pass over the text; the matched label decides the entity type
+        for match in _ENTITY_LABEL_RE.finditer(text):
+            name = match.group("name").strip()
+            if name and len(name) > 1:  # Avoid single characters
+                entity_type = _ENTITY_LABEL_TYPES[match.group("label").lower()]
+                entity = LightRAGEntity(
+                    name=name,
+                    entity_type=entity_type,
+                    description=f"A {entity_type} mentioned in the response",
+                    properties={},
+                )
+                entities.append(entity)
 
         # If still no entities found, create a generic one based on the query
         if not entities:
@@ -926,40 +1096,9 @@ Return only the YAML object, no additional text or explanations."""
 
     def _mock_get_entity_details(self, entity_name: str) -> LightRAGEntity | None:
         """Mock get entity details for testing."""
-        mock_entities = {
-            "lily": LightRAGEntity(
-                name="Lily",
-                entity_type="character",
-                description="A curious and brave 8-year-old girl who loves adventures",
-                properties={
-                    "age": 8,
-                    "personality": "curious and brave",
-                    "role": "protagonist",
-                },
-            ),
-            "purple dragon": LightRAGEntity(
-                name="Purple Dragon",
-                entity_type="character",
-                description="A friendly purple dragon who lives in the magic forest",
-                properties={
-                    "color": "purple",
-                    "personality": "friendly",
-                    "habitat": "magic forest",
-                },
-            ),
-            "magic forest": LightRAGEntity(
-                name="Magic Forest",
-                entity_type="location",
-                description="A mystical forest filled with magical creatures and wonders",
-                properties={
-                    "type": "magical",
-                    "accessibility": "public",
-                    "danger_level": "low",
-                },
-            ),
-        }
-
-        return mock_entities.get(entity_name.lower())
+        entity = _MOCK_ENTITIES.get(entity_name.lower())
+        # Callers may annotate the entity or its properties, so never share them
+        return copy.deepcopy(entity) if entity is not None else None
 
     def _mock_get_entity_types(self) -> list[str]:
         """Mock get entity types for testing."""
@@ -967,34 +1106,11 @@ Return only the YAML object, no additional text or explanations."""
 
     def _mock_health_status(self) -> LightRAGHealthStatus:
         """Mock health status for testing."""
-        return LightRAGHealthStatus(
-            status="healthy",
-            working_directory="./rag_storage",
-            input_directory="./inputs",
-            configuration={
-                "llm_binding": "mock",
-                "embedding_binding": "mock",
-                "workspace": "test",
-            },
-            pipeline_busy=False,
-            core_version="1.0.0-mock",
-            api_version="1.0.0-mock",
-        )
+        return copy.deepcopy(_MOCK_HEALTH_STATUS)
 
     def _get_http_error_message(self, status_code: int) -> str:
         """Get user-friendly error message for HTTP status codes."""
-        error_messages = {
-            400: "Bad Request - Invalid query parameters",
-            401: "Unauthorized - Invalid or missing API key",
-            403: "Forbidden - Access denied",
-            404: "Not Found - Endpoint or resource not found",
-            429: "Too Many Requests - Rate limit exceeded",
-            500: "Internal Server Error - Server encountered an error",
-            502: "Bad Gateway - Server is temporarily unavailable",
-            503: "Service Unavailable - Server is overloaded",
-            504: "Gateway Timeout - Server took too long to respond",
-        }
-        return error_messages.get(status_code, f"HTTP {status_code} error")
+        return _ERROR_MESSAGES.get(status_code, f"HTTP {status_code} error")
 
     def _handle_error_fallback(
         self,
@@ -1,15 +1,162 @@
 """Outline generation service using OpenAI for story structure creation."""
 
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
-from openai import OpenAI
+import yaml
+from openai import APIError, AsyncOpenAI
 
 from ..models.api_config import CreativeAPIConfig
 from ..models.story_context import StoryContext
+from ..utils import openai_batches
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.openai_clients import create_async_client, get_shared_client
+from ..utils.prompt_caching import (
+    build_system_message,
+    cache_write_tokens,
+    cached_prompt_tokens,
+)
+from ..utils.story_prompts import describe_entities, format_plot_points
 from .length_validator import LengthValidator
 from .template_loader import TemplateLoader
 from .token_tracker import TokenTracker
 
+try:
+    # libyaml-backed loader, much faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+# Completed responses kept for identical repeat requests
+_RESPONSE_CACHE_MAX_SIZE = 1024
+
+# Leading or trailing whitespace on any line, newlines excluded
+_LINE_EDGE_WHITESPACE_RE = re.compile(r"^[^\S\n]+|[^\S\n]+$", re.MULTILINE)
+
+# Marker the model places between outlines in a batched response
+_OUTLINE_BREAK = "<<<OUTLINE_BREAK>>>"
+
+# Static instructions sent ahead of every outline request when the system
+# prompt template cannot be loaded; kept first so providers can cache them
+_FALLBACK_SYSTEM_PROMPT = """You are an expert children's story writer who creates engaging, age-appropriate story outlines with clear structure and moral lessons.
+
+**Requirements for the outline:**
+1. Create a clear 3-act structure (Beginning, Middle, End)
+2. Include 4-6 main scenes/events
+3. Ensure age-appropriate content
+4. Include character development and growth
+5. Add a clear moral lesson or positive message
+6. Make it engaging and suitable for bedtime reading
+7. Use markdown formatting with clear headings
+
+**Format the outline as:**
+# Story Outline: [Title]
+
+## Act I: Beginning
+### Scene 1: [Scene Name]
+- [Brief description of what happens]
+- [Character development/conflict introduction]
+
+### Scene 2: [Scene Name]
+- [Brief description of what happens]
+- [Plot development]
+
+## Act II: Middle
+### Scene 3: [Scene Name]
+- [Brief description of what happens]
+- [Rising action/conflict development]
+
+### Scene 4: [Scene Name]
+- [Brief description of what happens]
+- [Character growth/challenges]
+
+### Scene 5: [Scene Name]
+- [Brief description of what happens]
+- [Climax preparation]
+
+## Act III: End
+### Scene 6: [Scene Name]
+- [Brief description of what happens]
+- [Resolution and moral lesson]
+
+## Key Themes
+- [Theme 1]
+- [Theme 2]
+
+## Moral Lesson
+[Clear, age-appropriate moral lesson]"""
+
+# Request prompt used when the user prompt template cannot be rendered
+_FALLBACK_USER_PROMPT = """Create a detailed story outline for a {genre} bedtime story with a {tone} tone.
+
+**Story Requirements:**
+- Genre: {genre}
+- Tone: {tone}
+- Length: {length}
+- Age Appropriate: {age_appropriate}
+- Morals: {morals}
+
+**Characters:**
+{characters}
+
+**Locations:**
+{locations}
+
+**Items/Objects:**
+{items}
+
+**Plot Points:**
+{plot_points}
+
+**Original Request:**
+{user_inputs}
+
+Generate the outline now:"""
+
+# Outline returned when generation fails
+_FALLBACK_OUTLINE = """# Story Outline: {main_character}'s Adventure
+
+## Act I: Beginning
+### Scene 1: The Setup
+- {main_character} is introduced
+- The adventure begins when they {main_plot}
+
+### Scene 2: The Call to Adventure
+- {main_character} faces their first challenge
+- They must make an important decision
+
+## Act II: Middle
+### Scene 3: The Journey
+- {main_character} encounters obstacles
+- They learn important lessons along the way
+
+### Scene 4: The Challenge
+- {main_character} faces their biggest test
+- They must overcome their fears
+
+### Scene 5: The Turning Point
+- {main_character} discovers inner strength
+- The situation begins to improve
+
+## Act III: End
+### Scene 6: The Resolution
+- {main_character} achieves their goal
+- They return home wiser and stronger
+
+## Key Themes
+- Courage and determination
+- The importance of trying your best
+
+## Moral Lesson
+Even when things seem difficult, with courage and determination, you can overcome any challenge and achieve your goals.
+"""
+
 
 class OutlineGenerator:
     """Generates story outlines from context using OpenAI."""
@@ -23,114 +170,426 @@ class OutlineGenerator:
     ):
         """Initialize the outline generator with OpenAI configuration."""
         self.config = config or self._load_config_from_env()
-        self.client = OpenAI(api_key=self.config.api_key, base_url=self.config.base_url)
+        self.client = get_shared_client(self.config.api_key, self.config.base_url)
         self.template_loader = template_loader or TemplateLoader()
         self.token_tracker = token_tracker or TokenTracker()
         self.length_validator = length_validator or LengthValidator()
+        self._aclient: AsyncOpenAI | None = None
+        self._aclient_loop: asyncio.AbstractEventLoop | None = None
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        # Skips the API during sustained outages; failures here are the ones
+        # left after the client's own retries
+        self._breaker = CircuitBreaker(
+            fail_max=10,
+            reset_timeout=60.0,
+            failure_types=(APIError,),
+        )
+        self._system_prompt = self._load_system_prompt()
+        # Built once and shared by every request; the SDK does not mutate it
+        self._system_message = build_system_message(
+            self._system_prompt,
+            self.config.base_url,
+            self.config.model,
+        )
 
     def _load_config_from_env(self) -> CreativeAPIConfig:
         """Load configuration from environment variables."""
         import os
 
+        # Outlines are only capped when a limit is configured explicitly
+        max_tokens = os.getenv("OPENAI_CREATIVE_MAX_TOKENS")
+
         return CreativeAPIConfig(
             api_key=os.getenv("OPENAI_CREATIVE_API_KEY", ""),
             base_url=os.getenv("OPENAI_CREATIVE_BASE_URL", "https://api.openai.com/v1"),
             model=os.getenv("OPENAI_CREATIVE_MODEL", "gpt-4o-mini"),
-            max_tokens=int(os.getenv("OPENAI_CREATIVE_MAX_TOKENS", "2000")),
+            max_tokens=int(max_tokens) if max_tokens else None,
             temperature=float(os.getenv("OPENAI_CREATIVE_TEMPERATURE", "0.7")),
         )
 
+    def _load_system_prompt(self) -> str:
+        """Load the static outline instructions that open every request."""
+        try:
+            return self.template_loader.load_system_prompt("outline_generation")
+        except Exception:
+            return _FALLBACK_SYSTEM_PROMPT
+
     def generate_outline(self, context: StoryContext) -> str:
         """Generate a story outline from the given context."""
         prompt = self._build_outline_prompt(context)
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert children's story writer who creates engaging, age-appropriate story outlines with clear structure and moral lessons.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
+            params = self._completion_params(prompt)
+            cache_key = self._response_cache_key(params)
+            content = self._get_cached_response(cache_key)
+
+            if content is None:
+                with self._breaker:
+                    content = "".join(self._stream_completion(params, prompt))
+                if not content:
+                    return self._fallback_outline(context)
+                self._cache_response(cache_key, content)
+
+            return self._finalize_outline(context, content)
+
+        except Exception as e:
+            # Fallback to basic outline if OpenAI fails
+            return self._fallback_outline(context)
+
+    def stream_outline(self, context: StoryContext) -> Iterator[str]:
+        """
+        Stream raw outline text as the model generates it.
+
+        Fragments are yielded unformatted, and API errors (including
+        CircuitOpenError during an outage) propagate to the caller instead
+        of producing a fallback outline.
+
+        Args:
+            context: Story context to generate an outline for
+
+        Yields:
+            Outline text fragments in generation order
+        """
+        prompt = self._build_outline_prompt(context)
+        with self._breaker:
+            yield from self._stream_completion(self._completion_params(prompt), prompt)
+
+    def _stream_completion(
+        self,
+        params: dict[str, Any],
+        input_text: str,
+    ) -> Iterator[str]:
+        """Yield a streamed completion's text and track usage when it ends."""
+        stream = self.client.chat.completions.create(
+            **params,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        parts: list[str] = []
+        usage = None
+        for chunk in stream:
+            # The final chunk carries the usage totals and no choices
+            if chunk.usage:
+                usage = chunk.usage
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        if usage:
+            self._track_usage(usage, input_text, "".join(parts))
+
+    async def agenerate_outline(self, context: StoryContext) -> str:
+        """Generate a story outline from the given context without blocking."""
+        prompt = self._build_outline_prompt(context)
+
+        try:
+            params = self._completion_params(prompt)
+            cache_key = self._response_cache_key(params)
+            content = self._get_cached_response(cache_key)
+
+            if content is None:
+                client = self._get_async_client()
+                with self._breaker:
+                    response = await client.chat.completions.create(**params)
+                content = self._content_from_response(response, prompt)
+                if content is None:
+                    return self._fallback_outline(context)
+                self._cache_response(cache_key, content)
+
+            return self._finalize_outline(context, content)
+
+        except Exception as e:
+            # Fallback to basic outline if OpenAI fails
+            return self._fallback_outline(context)
+
+    async def agenerate_outlines(
+        self,
+        contexts: list[StoryContext],
+        max_concurrency: int = 16,
+    ) -> list[str]:
+        """
+        Generate outlines for several contexts concurrently.
+
+        Args:
+            contexts: Story contexts to generate outlines for
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Outlines in the same order as the given contexts
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(context: StoryContext) -> str:
+            async with semaphore:
+                return await self.agenerate_outline(context)
+
+        return list(await asyncio.gather(*(run(context) for context in contexts)))
+
+    def generate_outlines_batched(
+        self,
+        contexts: list[StoryContext],
+        batch_size: int = 10,
+    ) -> list[str]:
+        """
+        Generate outlines for several contexts with one request per batch.
+
+        Each batch asks the model for all of its outlines in a single
+        completion. A batch whose response does not split into one outline
+        per context is regenerated one context at a time.
+
+        Args:
+            contexts: Story contexts to generate outlines for
+            batch_size: Maximum number of contexts sent in one request
+
+        Returns:
+            Outlines in the same order as the given contexts
+        """
+        outlines: list[str] = []
+        for start in range(0, len(contexts), batch_size):
+            outlines.extend(
+                self._generate_outline_batch(contexts[start : start + batch_size]),
             )
+        return outlines
+
+    def _generate_outline_batch(self, contexts: list[StoryContext]) -> list[str]:
+        """Generate the outlines for one batch of contexts in a single request."""
+        if len(contexts) == 1:
+            return [self.generate_outline(contexts[0])]
+
+        prompt = self._build_batch_prompt(contexts)
+        sections: list[str] = []
+
+        try:
+            params = self._completion_params(prompt)
+            if self.config.max_tokens is not None:
+                params["max_tokens"] = self.config.max_tokens * len(contexts)
+            with self._breaker:
+                response = self.client.chat.completions.create(**params)
+            content = self._content_from_response(
+                response,
+                prompt,
+                operation="generate_outlines_batched",
+            )
+            if content:
+                sections = [
+                    section.strip()
+                    for section in content.split(_OUTLINE_BREAK)
+                    if section.strip()
+                ]
+        except Exception:
+            sections = []
+
+        if len(sections) != len(contexts):
+            # The split cannot be trusted, so fall back to one request each
+            return [self.generate_outline(context) for context in contexts]
+
+        return [
+            self._finalize_outline(context, section)
+            for context, section in zip(contexts, sections, strict=True)
+        ]
+
+    def _build_batch_prompt(self, contexts: list[StoryContext]) -> str:
+        """Build a single prompt asking for one outline per context."""
+        count = len(contexts)
+        requests = "\n\n".join(
+            f"## Outline {index} request\n\n"
+            + self._build_outline_prompt(context)
+            .rstrip()
+            .removesuffix("Generate the outline now:")
+            .rstrip()
+            for index, context in enumerate(contexts, start=1)
+        )
+
+        return (
+            f"Generate {count} independent story outlines, one for each request "
+            f"below, in the same order. Separate consecutive outlines with the "
+            f"literal marker {_OUTLINE_BREAK} on its own line.\n\n"
+            f"{requests}\n\n"
+            f"Remember, you have to produce {count} outlines in total; "
+            f"plan in advance."
+        )
 
-            # Track token usage
-            if hasattr(response, "usage") and response.usage:
-                self.token_tracker.track_usage(
-                    service="outline_generator",
-                    operation="generate_outline",
-                    model=self.config.model,
-                    prompt_tokens=response.usage.prompt_tokens,
-                    completion_tokens=response.usage.completion_tokens,
-                    input_text=str(context.model_dump()),
-                    output_text=response.choices[0].message.content or "",
+    def build_batch_jsonl(
+        self,
+        contexts: list[StoryContext],
+        output_file: str,
+    ) -> Path:
+        """
+        Write Batch API requests for the given contexts to a JSONL file.
+
+        Args:
+            contexts: Story contexts to generate outlines for
+            output_file: Path of the JSONL file to write
+
+        Returns:
+            Path of the written file. Each request's custom_id is
+            ``outline-<index>`` for the context at that index.
+        """
+        return openai_batches.write_batch_jsonl(
+            (
+                (
+                    f"outline-{index}",
+                    self._completion_params(self._build_outline_prompt(context)),
                 )
+                for index, context in enumerate(contexts)
+            ),
+            output_file,
+        )
 
-            content = response.choices[0].message.content
-            if content is None:
-                return self._fallback_outline(context)
+    def submit_batch(self, jsonl_file: str | Path) -> str:
+        """
+        Upload a batch request file and start a Batch API job.
 
-            outline = self._format_outline(content)
+        Args:
+            jsonl_file: File written by build_batch_jsonl
 
-            # Validate and optimize outline length
-            length_spec = context.get_effective_length_spec()
-            validation_result = self.length_validator.validate_outline_length(
+        Returns:
+            ID of the created batch
+        """
+        return openai_batches.submit_batch(self.client, jsonl_file)
+
+    def collect_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+    ) -> dict[str, str]:
+        """
+        Wait for a Batch API job to finish and return its outlines.
+
+        Args:
+            batch_id: ID returned by submit_batch
+            poll_interval: Seconds to wait between status checks
+
+        Returns:
+            Formatted outlines keyed by request custom_id. Requests that
+            failed or returned no content are left out.
+
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        contents = openai_batches.collect_batch(self.client, batch_id, poll_interval)
+        return {
+            custom_id: self._format_outline(content)
+            for custom_id, content in contents.items()
+        }
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async OpenAI client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        # Pooled connections are bound to the loop that opened them
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = create_async_client(
+                self.config.api_key,
+                self.config.base_url,
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _completion_params(self, prompt: str) -> dict[str, Any]:
+        """Build the chat completion request parameters for an outline prompt."""
+        params: dict[str, Any] = {
+            "model": self.config.model,
+            # Static instructions lead so repeated requests share a cacheable prefix
+            "messages": [
+                self._system_message,
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": self.config.temperature,
+        }
+        if self.config.max_tokens is not None:
+            params["max_tokens"] = self.config.max_tokens
+        return params
+
+    def _content_from_response(
+        self,
+        response: Any,
+        input_text: str,
+        operation: str = "generate_outline",
+    ) -> str | None:
+        """Track token usage for a completion response and return its content."""
+        content: str | None = response.choices[0].message.content
+
+        # Track token usage
+        if hasattr(response, "usage") and response.usage:
+            self._track_usage(response.usage, input_text, content or "", operation)
+
+        return content
+
+    def _track_usage(
+        self,
+        usage: Any,
+        input_text: str,
+        output_text: str,
+        operation: str = "generate_outline",
+    ) -> None:
+        """Record the token usage reported for one completion."""
+        self.token_tracker.track_usage(
+            service="outline_generator",
+            operation=operation,
+            model=self.config.model,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            input_text=input_text,
+            output_text=output_text,
+            cached_tokens=cached_prompt_tokens(usage),
+            cache_write_tokens=cache_write_tokens(usage),
+        )
+
+    def _finalize_outline(self, context: StoryContext, content: str) -> str:
+        """Format generated content and fit it to the context's length target."""
+        outline = self._format_outline(content)
+
+        # Validate and optimize outline length
+        length_spec = context.get_effective_length_spec()
+        validation_result = self.length_validator.validate_outline_length(
+            outline,
+            length_spec,
+        )
+
+        if validation_result["adjustment_needed"]:
+            # Try to optimize the outline
+            outline = self.length_validator.optimize_outline_for_length(
                 outline,
                 length_spec,
             )
 
-            if validation_result["adjustment_needed"]:
-                # Try to optimize the outline
-                outline = self.length_validator.optimize_outline_for_length(
-                    outline,
-                    length_spec,
-                )
+        return outline
 
-            return outline
+    def _response_cache_key(self, params: dict[str, Any]) -> str:
+        """Hash the full request so only identical requests share a response."""
+        serialized = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
 
-        except Exception as e:
-            # Fallback to basic outline if OpenAI fails
-            return self._fallback_outline(context)
+    def _get_cached_response(self, cache_key: str) -> str | None:
+        """Return cached completion content and mark it as recently used."""
+        content = self._response_cache.get(cache_key)
+        if content is not None:
+            self._response_cache.move_to_end(cache_key)
+        return content
+
+    def _cache_response(self, cache_key: str, content: str) -> None:
+        """Store completion content, evicting the least recently used entry."""
+        self._response_cache[cache_key] = content
+        if len(self._response_cache) > _RESPONSE_CACHE_MAX_SIZE:
+            self._response_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Clear the cached outline responses."""
+        self._response_cache.clear()
 
     def _build_outline_prompt(self, context: StoryContext) -> str:
         """Build the prompt for outline generation using templates."""
         try:
-            # Extract key information from context
-            entities = list(context.entities.values())
-            characters = [e for e in entities if e.type == "character"]
-            locations = [e for e in entities if e.type == "location"]
-            items = [e for e in entities if e.type == "item"]
-
-            # Build character descriptions
-            character_descriptions = []
-            for char in characters:
-                desc = f"- {char.name}: {char.description}"
-                if char.subtype:
-                    desc += f" ({char.subtype})"
-                character_descriptions.append(desc)
-
-            # Build location descriptions
-            location_descriptions = []
-            for loc in locations:
-                desc = f"- {loc.name}: {loc.description}"
-                if loc.subtype:
-                    desc += f" ({loc.subtype})"
-                location_descriptions.append(desc)
-
-            # Build item descriptions
-            item_descriptions = []
-            for item in items:
-                desc = f"- {item.name}: {item.description}"
-                if item.subtype:
-                    desc += f" ({item.subtype})"
-                item_descriptions.append(desc)
+            # Build entity descriptions
+            character_descriptions, location_descriptions, item_descriptions = (
+                describe_entities(context)
+            )
 
             # Get plot points
-            plot_points_text = "\n".join(f"- {point}" for point in context.plot_points)
+            plot_points_text = format_plot_points(context.plot_points)
 
             # Get user inputs
             user_inputs_text = "\n".join(
@@ -142,19 +601,17 @@ class OutlineGenerator:
             length_spec = context.get_effective_length_spec()
 
             # Prepare context for template
+            settings = context.settings
+            morals = settings.get("morals")
             template_context = {
-                "genre": context.settings.get("genre", "adventure"),
-                "tone": context.settings.get("tone", "gentle"),
-                "length": context.settings.get("length", "short"),
+                "genre": settings.get("genre", "adventure"),
+                "tone": settings.get("tone", "gentle"),
+                "length": settings.get("length", "short"),
                 "target_word_count": length_spec.get_target_word_count(),
                 "target_reading_time": length_spec.get_target_reading_time(),
                 "length_type": length_spec.length_type,
-                "age_appropriate": context.settings.get("age_appropriate", True),
-                "morals": (
-                    ", ".join(context.settings.get("morals", []))
-                    if context.settings.get("morals")
-                    else "None specified"
-                ),
+                "age_appropriate": settings.get("age_appropriate", True),
+                "morals": ", ".join(morals) if morals else "None specified",
                 "characters": (
                     "\n".join(character_descriptions)
                     if character_descriptions
@@ -193,115 +650,46 @@ class OutlineGenerator:
 
     def _fallback_outline_prompt(self, context: StoryContext) -> str:
         """Fallback outline prompt when templates fail."""
-        # Extract key information from context
-        entities = list(context.entities.values())
-        characters = [e for e in entities if e.type == "character"]
-        locations = [e for e in entities if e.type == "location"]
-        items = [e for e in entities if e.type == "item"]
-
-        # Build character descriptions
-        character_descriptions = []
-        for char in characters:
-            desc = f"- {char.name}: {char.description}"
-            if char.subtype:
-                desc += f" ({char.subtype})"
-            character_descriptions.append(desc)
-
-        # Build location descriptions
-        location_descriptions = []
-        for loc in locations:
-            desc = f"- {loc.name}: {loc.description}"
-            if loc.subtype:
-                desc += f" ({loc.subtype})"
-            location_descriptions.append(desc)
-
-        # Build item descriptions
-        item_descriptions = []
-        for item in items:
-            desc = f"- {item.name}: {item.description}"
-            if item.subtype:
-                desc += f" ({item.subtype})"
-            item_descriptions.append(desc)
+        # Build entity descriptions
+        character_descriptions, location_descriptions, item_descriptions = (
+            describe_entities(context)
+        )
 
         # Get plot points
-        plot_points_text = "\n".join(f"- {point}" for point in context.plot_points)
+        plot_points_text = format_plot_points(context.plot_points)
 
         # Get user inputs
         user_inputs_text = "\n".join(
             f"- {input_id}: {text}" for input_id, text in context.user_inputs.items()
         )
 
-        return f"""Create a detailed story outline for a {context.settings.get("genre", "adventure")} bedtime story with a {context.settings.get("tone", "gentle")} tone.
-
-**Story Requirements:**
-- Genre: {context.settings.get("genre", "adventure")}
-- Tone: {context.settings.get("tone", "gentle")}
-- Length: {context.settings.get("length", "short")}
-- Age Appropriate: {context.settings.get("age_appropriate", True)}
-- Morals: {", ".join(context.settings.get("morals", [])) if context.settings.get("morals") else "None specified"}
-
-**Characters:**
-{chr(10).join(character_descriptions) if character_descriptions else "- No specific characters mentioned"}
-
-**Locations:**
-{chr(10).join(location_descriptions) if location_descriptions else "- No specific locations mentioned"}
-
-**Items/Objects:**
-{chr(10).join(item_descriptions) if item_descriptions else "- No specific items mentioned"}
-
-**Plot Points:**
-{plot_points_text if plot_points_text else "- No specific plot points mentioned"}
-
-**Original Request:**
-{user_inputs_text if user_inputs_text else "No specific request provided"}
-
-**Requirements for the outline:**
-1. Create a clear 3-act structure (Beginning, Middle, End)
-2. Include 4-6 main scenes/events
-3. Ensure age-appropriate content
-4. Include character development and growth
-5. Add a clear moral lesson or positive message
-6. Make it engaging and suitable for bedtime reading
-7. Use markdown formatting with clear headings
-
-**Format the outline as:**
-# Story Outline: [Title]
-
-## Act I: Beginning
-### Scene 1: [Scene Name]
-- [Brief description of what happens]
-- [Character development/conflict introduction]
-
-### Scene 2: [Scene Name]
-- [Brief description of what happens]
-- [Plot development]
-
-## Act II: Middle
-### Scene 3: [Scene Name]
-- [Brief description of what happens]
-- [Rising action/conflict development]
-
-### Scene 4: [Scene Name]
-- [Brief description of what happens]
-- [Character growth/challenges]
-
-### Scene 5: [Scene Name]
-- [Brief description of what happens]
-- [Climax preparation]
-
-## Act III: End
-### Scene 6: [Scene Name]
-- [Brief description of what happens]
-- [Resolution and moral lesson]
-
-## Key Themes
-- [Theme 1]
-- [Theme 2]
-
-## Moral Lesson
-[Clear, age-appropriate moral lesson]
-
-Generate the outline now:"""
+        settings = context.settings
+        morals = settings.get("morals")
+
+        return _FALLBACK_USER_PROMPT.format(
+            genre=settings.get("genre", "adventure"),
+            tone=settings.get("tone", "gentle"),
+            length=settings.get("length", "short"),
+            age_appropriate=settings.get("age_appropriate", True),
+            morals=", ".join(morals) if morals else "None specified",
+            characters=(
+                "\n".join(character_descriptions)
+                if character_descriptions
+                else "- No specific characters mentioned"
+            ),
+            locations=(
+                "\n".join(location_descriptions)
+                if location_descriptions
+                else "- No specific locations mentioned"
+            ),
+            items=(
+                "\n".join(item_descriptions)
+                if item_descriptions
+                else "- No specific items mentioned"
+            ),
+            plot_points=plot_points_text or "- No specific plot points mentioned",
+            user_inputs=user_inputs_text or "No specific request provided",
+        )
 
     def _format_outline(self, content: str) -> str:
         """Format the generated outline content."""
@@ -312,76 +700,34 @@ Generate the outline now:"""
         if not content.startswith("#"):
             content = f"# Story Outline\n\n{content}"
 
-        # Add some basic formatting improvements
-        lines = content.split("\n")
-        formatted_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if line:
-                formatted_lines.append(line)
-            else:
-                formatted_lines.append("")
-
-        return "\n".join(formatted_lines)
+        # Strip every line in a single pass
+        return _LINE_EDGE_WHITESPACE_RE.sub("", content)
 
     def _fallback_outline(self, context: StoryContext) -> str:
         """Generate a basic fallback outline when OpenAI fails."""
         # Extract main character
-        characters = [e for e in context.entities.values() if e.type == "character"]
-        main_character = characters[0].name if characters else "The Hero"
+        main_character = next(
+            (e.name for e in context.entities.values() if e.type == "character"),
+            "The Hero",
+        )
 
         # Get plot points
         plot_points = context.plot_points
         main_plot = plot_points[0] if plot_points else "goes on an adventure"
 
-        return f"""# Story Outline: {main_character}'s Adventure
-
-## Act I: Beginning
-### Scene 1: The Setup
-- {main_character} is introduced
-- The adventure begins when they {main_plot}
-
-### Scene 2: The Call to Adventure
-- {main_character} faces their first challenge
-- They must make an important decision
-
-## Act II: Middle
-### Scene 3: The Journey
-- {main_character} encounters obstacles
-- They learn important lessons along the way
-
-### Scene 4: The Challenge
-- {main_character} faces their biggest test
-- They must overcome their fears
-
-### Scene 5: The Turning Point
-- {main_character} discovers inner strength
-- The situation begins to improve
-
-## Act III: End
-### Scene 6: The Resolution
-- {main_character} achieves their goal
-- They return home wiser and stronger
-
-## Key Themes
-- Courage and determination
-- The importance of trying your best
-
-## Moral Lesson
-Even when things seem difficult, with courage and determination, you can overcome any challenge and achieve your goals.
-"""
+        return _FALLBACK_OUTLINE.format(
+            main_character=main_character,
+            main_plot=main_plot,
+        )
 
     def load_context_from_file(self, context_file: str) -> StoryContext:
         """Load a StoryContext from a YAML file."""
-        import yaml
-
         context_path = Path(context_file)
         if not context_path.exists():
             raise FileNotFoundError(f"Context file not found: {context_file}")
 
-        with open(context_path, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        # The YAML reader detects the encoding itself, so skip text decoding
+        data = yaml.load(context_path.read_bytes(), Loader=_YamlLoader)
 
         return StoryContext(**data)
 
@@ -389,9 +735,7 @@ Even when things seem difficult, with courage and determination, you can overcom
         """Save the outline to a markdown file."""
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(outline)
+        output_path.write_text(outline, encoding="utf-8")
 
     def update_context_with_outline(self, context: StoryContext, outline: str) -> None:
         """Update the context with the generated outline."""
@@ -1,16 +1,108 @@
 """Story writing service using OpenAI for final story generation."""
 
+import asyncio
 import re
+from collections import OrderedDict
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
-from openai import OpenAI
+import yaml
+from openai import AsyncOpenAI
 
 from ..models.api_config import CreativeAPIConfig
 from ..models.story_context import StoryContext
+from ..utils import openai_batches
+from ..utils.openai_clients import create_async_client, get_shared_client
+from ..utils.prompt_caching import (
+    build_system_message,
+    cache_write_tokens,
+    cached_prompt_tokens,
+)
+from ..utils.story_prompts import describe_entities, format_plot_points
 from .length_validator import LengthValidator
 from .template_loader import TemplateLoader
 from .token_tracker import TokenTracker
 
+try:
+    # libyaml-backed loader, much faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+# Upper bound on memoized prompt blocks kept per writer instance
+_CONTEXT_BLOCKS_CACHE_MAX_SIZE = 256
+
+# Target word counts for the fallback prompt, by length setting
+_LENGTH_TARGET_WORD_COUNTS = {
+    "very_short": 200,
+    "short": 500,
+    "medium": 1000,
+    "long": 2000,
+    "very_long": 3000,
+}
+
+# Leading or trailing whitespace on any line, newlines excluded
+_LINE_EDGE_WHITESPACE_RE = re.compile(r"^[^\S\n]+|[^\S\n]+$", re.MULTILINE)
+
+# Two or more consecutive blank lines once lines are stripped
+_BLANK_LINE_RUN_RE = re.compile(r"\n{3,}")
+
+# Markdown syntax characters dropped before counting words
+_MARKDOWN_DELETE_TABLE = str.maketrans("", "", "#*_`[]()")
+
+# Static instructions sent ahead of every story request when the system
+# prompt template cannot be loaded; kept first so providers can cache them
+_FALLBACK_SYSTEM_PROMPT = """You are an expert children's story writer who creates engaging, age-appropriate bedtime stories with clear narrative flow, character development, and positive moral lessons.
+
+**Requirements for the story:**
+1. Write in plain markdown format with proper paragraph breaks
+2. Use engaging, age-appropriate language
+3. Include dialogue to bring characters to life
+4. Follow the outline structure but expand each scene into full narrative
+5. Ensure smooth transitions between scenes
+6. Include descriptive details about settings and characters
+7. Build tension and resolution appropriately
+8. End with a clear moral lesson or positive message
+9. Use simple, clear sentences suitable for bedtime reading
+10. Include emotional depth and character growth
+
+**Format the story as:**
+# [Story Title]
+
+[Story content in markdown format with proper paragraphs, dialogue, and narrative flow]"""
+
+
+# Request prompt used when the user prompt template cannot be rendered
+_FALLBACK_USER_PROMPT = """Write a complete bedtime story based on the provided outline and context.
+
+**Story Requirements:**
+- Genre: {genre}
+- Tone: {tone}
+- Length: {length} (aim for {target_word_count} words)
+- Age Appropriate: {age_appropriate}
+- Morals: {morals}
+
+**Characters:**
+{characters}
+
+**Locations:**
+{locations}
+
+**Items/Objects:**
+{items}
+
+**Plot Points:**
+{plot_points}
+
+**Original Request:**
+{user_inputs}
+
+**Story Outline to Follow:**
+{outline}
+
+Write the complete story now:"""
+
 
 class StoryWriter:
     """Generates final stories from outlines using OpenAI."""
@@ -24,10 +116,21 @@ class StoryWriter:
     ):
         """Initialize the story writer with OpenAI configuration."""
         self.config = config or self._load_config_from_env()
-        self.client = OpenAI(api_key=self.config.api_key, base_url=self.config.base_url)
+        self.client = get_shared_client(self.config.api_key, self.config.base_url)
         self.template_loader = template_loader or TemplateLoader()
         self.token_tracker = token_tracker or TokenTracker()
         self.length_validator = length_validator or LengthValidator()
+        self._aclient: AsyncOpenAI | None = None
+        self._aclient_loop: asyncio.AbstractEventLoop | None = None
+        self._context_blocks_cache: OrderedDict[tuple, dict[str, str]] = OrderedDict()
+        self._system_prompt = self._load_system_prompt()
+        # Built once and shared by every request; Claude endpoints get an
+        # explicit cache breakpoint after the static instructions
+        self._system_message = build_system_message(
+            self._system_prompt,
+            self.config.base_url,
+            self.config.model,
+        )
 
     def _load_config_from_env(self) -> CreativeAPIConfig:
         """Load configuration from environment variables."""
@@ -41,147 +144,335 @@ class StoryWriter:
             temperature=float(os.getenv("OPENAI_CREATIVE_TEMPERATURE", "0.8")),
         )
 
+    def _load_system_prompt(self) -> str:
+        """Load the static story instructions that open every request."""
+        try:
+            return self.template_loader.load_system_prompt("story_generation")
+        except Exception:
+            return _FALLBACK_SYSTEM_PROMPT
+
     def generate_story(self, context: StoryContext, outline: str) -> str:
         """Generate a final story from the given context and outline."""
         prompt = self._build_story_prompt(context, outline)
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert children's story writer who creates engaging, age-appropriate bedtime stories with clear narrative flow, character development, and positive moral lessons.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
+            content = "".join(
+                self._stream_completion(self._completion_params(prompt), prompt),
             )
+            if not content:
+                return self._fallback_story(context, outline)
 
-            # Track token usage
-            if hasattr(response, "usage") and response.usage:
-                self.token_tracker.track_usage(
-                    service="story_writer",
-                    operation="generate_story",
-                    model=self.config.model,
-                    prompt_tokens=response.usage.prompt_tokens,
-                    completion_tokens=response.usage.completion_tokens,
-                    input_text=f"{context.model_dump()!s}\n\nOutline:\n{outline}",
-                    output_text=response.choices[0].message.content or "",
-                )
+            return self._finalize_story(context, content)
 
-            content = response.choices[0].message.content
-            if content is None:
-                return self._fallback_story(context, outline)
+        except Exception as e:
+            # Fallback to basic story if OpenAI fails
+            return self._fallback_story(context, outline)
 
-            story = self._format_story(content)
+    async def agenerate_story(self, context: StoryContext, outline: str) -> str:
+        """Generate a final story from the given context and outline without blocking."""
+        prompt = self._build_story_prompt(context, outline)
 
-            # Validate story length
-            length_spec = context.get_effective_length_spec()
-            validation_result = self.length_validator.validate_story_length(
-                story,
-                length_spec,
+        try:
+            client = self._get_async_client()
+            response = await client.chat.completions.create(
+                **self._completion_params(prompt),
             )
+            content = response.choices[0].message.content
 
-            # Log length validation results
-            if hasattr(self, "logger"):
-                self.logger.info(
-                    f"Story length validation: {validation_result['actual_word_count']} words, "
-                    f"target: {validation_result['target_word_count']} words, "
-                    f"deviation: {validation_result['deviation_percent']:.1f}%",
-                )
+            # Track token usage
+            if hasattr(response, "usage") and response.usage:
+                self._track_usage(response.usage, prompt, content or "")
 
-            return story
+            if not content:
+                return self._fallback_story(context, outline)
+
+            return self._finalize_story(context, content)
 
         except Exception as e:
             # Fallback to basic story if OpenAI fails
             return self._fallback_story(context, outline)
 
+    async def agenerate_stories(
+        self,
+        jobs: list[tuple[StoryContext, str]],
+        max_concurrency: int = 16,
+    ) -> list[str]:
+        """
+        Generate stories for several context/outline pairs concurrently.
+
+        Args:
+            jobs: Story contexts paired with the outlines to follow
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Stories in the same order as the given jobs
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(context: StoryContext, outline: str) -> str:
+            async with semaphore:
+                return await self.agenerate_story(context, outline)
+
+        return list(
+            await asyncio.gather(*(run(context, outline) for context, outline in jobs)),
+        )
+
+    def build_batch_jsonl(
+        self,
+        jobs: list[tuple[StoryContext, str]],
+        output_file: str,
+    ) -> Path:
+        """
+        Write Batch API requests for the given story jobs to a JSONL file.
+
+        Args:
+            jobs: (context, outline) pairs to write stories for
+            output_file: Path of the JSONL file to write
+
+        Returns:
+            Path of the written file. Each request's custom_id is
+            ``story-<index>`` for the job at that index.
+        """
+        return openai_batches.write_batch_jsonl(
+            (
+                (
+                    f"story-{index}",
+                    self._completion_params(
+                        self._build_story_prompt(context, outline),
+                    ),
+                )
+                for index, (context, outline) in enumerate(jobs)
+            ),
+            output_file,
+        )
+
+    def submit_batch(self, jsonl_file: str | Path) -> str:
+        """
+        Upload a batch request file and start a Batch API job.
+
+        Args:
+            jsonl_file: File written by build_batch_jsonl
+
+        Returns:
+            ID of the created batch
+        """
+        return openai_batches.submit_batch(self.client, jsonl_file)
+
+    def collect_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+    ) -> dict[str, str]:
+        """
+        Wait for a Batch API job to finish and return its stories.
+
+        Args:
+            batch_id: ID returned by submit_batch
+            poll_interval: Seconds to wait between status checks
+
+        Returns:
+            Formatted stories keyed by request custom_id. Requests that
+            failed or returned no content are left out.
+
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        contents = openai_batches.collect_batch(self.client, batch_id, poll_interval)
+        return {
+            custom_id: self._format_story(content)
+            for custom_id, content in contents.items()
+        }
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async OpenAI client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        # Pooled connections are bound to the loop that opened them
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = create_async_client(
+                self.config.api_key,
+                self.config.base_url,
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    def _finalize_story(self, context: StoryContext, content: str) -> str:
+        """Format generated content and check it against the length target."""
+        story = self._format_story(content)
+
+        # Validate story length
+        length_spec = context.get_effective_length_spec()
+        validation_result = self.length_validator.validate_story_length(
+            story,
+            length_spec,
+        )
+
+        # Log length validation results
+        if hasattr(self, "logger"):
+            self.logger.info(
+                f"Story length validation: {validation_result['actual_word_count']} words, "
+                f"target: {validation_result['target_word_count']} words, "
+                f"deviation: {validation_result['deviation_percent']:.1f}%",
+            )
+
+        return story
+
+    def stream_story(self, context: StoryContext, outline: str) -> Iterator[str]:
+        """
+        Stream raw story text as the model generates it.
+
+        Fragments are yielded unformatted, and API errors propagate to the
+        caller instead of producing a fallback story.
+
+        Args:
+            context: Story context to write the story for
+            outline: Outline the story should follow
+
+        Yields:
+            Story text fragments in generation order
+        """
+        prompt = self._build_story_prompt(context, outline)
+        yield from self._stream_completion(self._completion_params(prompt), prompt)
+
+    def _completion_params(self, prompt: str) -> dict[str, Any]:
+        """Build the chat completion request parameters for a story prompt."""
+        params: dict[str, Any] = {
+            "model": self.config.model,
+            # Static instructions lead so repeated requests share a cacheable prefix
+            "messages": [
+                self._system_message,
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": self.config.temperature,
+        }
+        if self.config.max_tokens is not None:
+            params["max_tokens"] = self.config.max_tokens
+        return params
+
+    def _stream_completion(
+        self,
+        params: dict[str, Any],
+        input_text: str,
+    ) -> Iterator[str]:
+        """Yield a streamed completion's text and track usage when it ends."""
+        stream = self.client.chat.completions.create(
+            **params,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        parts: list[str] = []
+        usage = None
+        for chunk in stream:
+            # The final chunk carries the usage totals and no choices
+            if chunk.usage:
+                usage = chunk.usage
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        # Track token usage
+        if usage:
+            self._track_usage(usage, input_text, "".join(parts))
+
+    def _track_usage(self, usage: Any, input_text: str, output_text: str) -> None:
+        """Record the token usage reported for one completion."""
+        self.token_tracker.track_usage(
+            service="story_writer",
+            operation="generate_story",
+            model=self.config.model,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            input_text=input_text,
+            output_text=output_text,
+            cached_tokens=cached_prompt_tokens(usage),
+            cache_write_tokens=cache_write_tokens(usage),
+        )
+
+    def _context_blocks_key(self, context: StoryContext) -> tuple:
+        """Key the prompt blocks on every context field they are built from."""
+        return (
+            tuple(
+                (entity.type, entity.name, entity.description, entity.subtype)
+                for entity in context.entities.values()
+            ),
+            tuple(context.plot_points),
+            tuple(context.user_inputs.items()),
+        )
+
+    def _context_blocks(self, context: StoryContext) -> dict[str, str]:
+        """
+        Return the entity, plot point and user input sections of a prompt.
+
+        Sections are memoized by context content, so retries and fallback
+        prompts for an unchanged context skip rebuilding them.
+
+        Args:
+            context: Story context to describe
+
+        Returns:
+            Prompt sections keyed by template variable name
+        """
+        cache_key = self._context_blocks_key(context)
+        blocks = self._context_blocks_cache.get(cache_key)
+        if blocks is not None:
+            self._context_blocks_cache.move_to_end(cache_key)
+            return blocks
+
+        # Build entity descriptions
+        character_descriptions, location_descriptions, item_descriptions = (
+            describe_entities(context)
+        )
+
+        # Get plot points
+        plot_points_text = format_plot_points(context.plot_points)
+
+        # Get user inputs
+        user_inputs_text = "\n".join(
+            f"- {input_id}: {text}" for input_id, text in context.user_inputs.items()
+        )
+
+        # Empty sections get a placeholder so the prompt never has a bare heading
+        characters = "\n".join(character_descriptions)
+        locations = "\n".join(location_descriptions)
+        items = "\n".join(item_descriptions)
+        blocks = {
+            "characters": characters or "- No specific characters mentioned",
+            "locations": locations or "- No specific locations mentioned",
+            "items": items or "- No specific items mentioned",
+            "plot_points": plot_points_text or "- No specific plot points mentioned",
+            "user_inputs": user_inputs_text or "No specific request provided",
+        }
+
+        self._context_blocks_cache[cache_key] = blocks
+        if len(self._context_blocks_cache) > _CONTEXT_BLOCKS_CACHE_MAX_SIZE:
+            self._context_blocks_cache.popitem(last=False)
+        return blocks
+
+    def clear_cache(self) -> None:
+        """Clear the memoized prompt blocks."""
+        self._context_blocks_cache.clear()
+
     def _build_story_prompt(self, context: StoryContext, outline: str) -> str:
         """Build the prompt for story generation using templates."""
         try:
-            # Extract key information from context
-            entities = list(context.entities.values())
-            characters = [e for e in entities if e.type == "character"]
-            locations = [e for e in entities if e.type == "location"]
-            items = [e for e in entities if e.type == "item"]
-
-            # Build character descriptions
-            character_descriptions = []
-            for char in characters:
-                desc = f"- {char.name}: {char.description}"
-                if char.subtype:
-                    desc += f" ({char.subtype})"
-                character_descriptions.append(desc)
-
-            # Build location descriptions
-            location_descriptions = []
-            for loc in locations:
-                desc = f"- {loc.name}: {loc.description}"
-                if loc.subtype:
-                    desc += f" ({loc.subtype})"
-                location_descriptions.append(desc)
-
-            # Build item descriptions
-            item_descriptions = []
-            for item in items:
-                desc = f"- {item.name}: {item.description}"
-                if item.subtype:
-                    desc += f" ({item.subtype})"
-                item_descriptions.append(desc)
-
-            # Get plot points
-            plot_points_text = "\n".join(f"- {point}" for point in context.plot_points)
-
-            # Get user inputs
-            user_inputs_text = "\n".join(
-                f"- {input_id}: {text}"
-                for input_id, text in context.user_inputs.items()
-            )
-
             # Get length specification
             length_spec = context.get_effective_length_spec()
 
             # Prepare context for template
+            settings = context.settings
+            morals = settings.get("morals")
             template_context = {
-                "genre": context.settings.get("genre", "adventure"),
-                "tone": context.settings.get("tone", "gentle"),
-                "length": context.settings.get("length", "short"),
+                "genre": settings.get("genre", "adventure"),
+                "tone": settings.get("tone", "gentle"),
+                "length": settings.get("length", "short"),
                 "target_word_count": length_spec.get_target_word_count(),
                 "target_reading_time": length_spec.get_target_reading_time(),
                 "length_type": length_spec.length_type,
-                "age_appropriate": context.settings.get("age_appropriate", True),
-                "morals": (
-                    ", ".join(context.settings.get("morals", []))
-                    if context.settings.get("morals")
-                    else "None specified"
-                ),
-                "characters": (
-                    "\n".join(character_descriptions)
-                    if character_descriptions
-                    else "- No specific characters mentioned"
-                ),
-                "locations": (
-                    "\n".join(location_descriptions)
-                    if location_descriptions
-                    else "- No specific locations mentioned"
-                ),
-                "items": (
-                    "\n".join(item_descriptions)
-                    if item_descriptions
-                    else "- No specific items mentioned"
-                ),
-                "plot_points": (
-                    plot_points_text
-                    if plot_points_text
-                    else "- No specific plot points mentioned"
-                ),
-                "user_inputs": (
-                    user_inputs_text
-                    if user_inputs_text
-                    else "No specific request provided"
-                ),
+                "age_appropriate": settings.get("age_appropriate", True),
+                "morals": ", ".join(morals) if morals else "None specified",
+                **self._context_blocks(context),
                 "outline": outline,
             }
 
@@ -196,100 +487,24 @@ class StoryWriter:
 
     def _fallback_story_prompt(self, context: StoryContext, outline: str) -> str:
         """Fallback story prompt when templates fail."""
-        # Extract key information from context
-        entities = list(context.entities.values())
-        characters = [e for e in entities if e.type == "character"]
-        locations = [e for e in entities if e.type == "location"]
-        items = [e for e in entities if e.type == "item"]
-
-        # Build character descriptions
-        character_descriptions = []
-        for char in characters:
-            desc = f"- {char.name}: {char.description}"
-            if char.subtype:
-                desc += f" ({char.subtype})"
-            character_descriptions.append(desc)
-
-        # Build location descriptions
-        location_descriptions = []
-        for loc in locations:
-            desc = f"- {loc.name}: {loc.description}"
-            if loc.subtype:
-                desc += f" ({loc.subtype})"
-            location_descriptions.append(desc)
-
-        # Build item descriptions
-        item_descriptions = []
-        for item in items:
-            desc = f"- {item.name}: {item.description}"
-            if item.subtype:
-                desc += f" ({item.subtype})"
-            item_descriptions.append(desc)
-
-        # Get plot points
-        plot_points_text = "\n".join(f"- {point}" for point in context.plot_points)
-
-        # Get user inputs
-        user_inputs_text = "\n".join(
-            f"- {input_id}: {text}" for input_id, text in context.user_inputs.items()
+        settings = context.settings
+        length = settings.get("length", "short")
+        morals = settings.get("morals")
+
+        return _FALLBACK_USER_PROMPT.format(
+            genre=settings.get("genre", "adventure"),
+            tone=settings.get("tone", "gentle"),
+            length=length,
+            target_word_count=self._get_target_word_count(length),
+            age_appropriate=settings.get("age_appropriate", True),
+            morals=", ".join(morals) if morals else "None specified",
+            outline=outline,
+            **self._context_blocks(context),
         )
 
-        return f"""Write a complete bedtime story based on the provided outline and context.
-
-**Story Requirements:**
-- Genre: {context.settings.get("genre", "adventure")}
-- Tone: {context.settings.get("tone", "gentle")}
-- Length: {context.settings.get("length", "short")} (aim for {self._get_target_word_count(context.settings.get("length", "short"))} words)
-- Age Appropriate: {context.settings.get("age_appropriate", True)}
-- Morals: {", ".join(context.settings.get("morals", [])) if context.settings.get("morals") else "None specified"}
-
-**Characters:**
-{chr(10).join(character_descriptions) if character_descriptions else "- No specific characters mentioned"}
-
-**Locations:**
-{chr(10).join(location_descriptions) if location_descriptions else "- No specific locations mentioned"}
-
-**Items/Objects:**
-{chr(10).join(item_descriptions) if item_descriptions else "- No specific items mentioned"}
-
-**Plot Points:**
-{plot_points_text if plot_points_text else "- No specific plot points mentioned"}
-
-**Original Request:**
-{user_inputs_text if user_inputs_text else "No specific request provided"}
-
-**Story Outline to Follow:**
-{outline}
-
-**Requirements for the story:**
-1. Write in plain markdown format with proper paragraph breaks
-2. Use engaging, age-appropriate language
-3. Include dialogue to bring characters to life
-4. Follow the outline structure but expand each scene into full narrative
-5. Ensure smooth transitions between scenes
-6. Include descriptive details about settings and characters
-7. Build tension and resolution appropriately
-8. End with a clear moral lesson or positive message
-9. Use simple, clear sentences suitable for bedtime reading
-10. Include emotional depth and character growth
-
-**Format the story as:**
-# [Story Title]
-
-[Story content in markdown format with proper paragraphs, dialogue, and narrative flow]
-
-Write the complete story now:"""
-
     def _get_target_word_count(self, length: str) -> int:
         """Get target word count based on length setting."""
-        length_targets = {
-            "very_short": 200,
-            "short": 500,
-            "medium": 1000,
-            "long": 2000,
-            "very_long": 3000,
-        }
-        return length_targets.get(length, 500)
+        return _LENGTH_TARGET_WORD_COUNTS.get(length, 500)
 
     def _format_story(self, content: str) -> str:
         """Format the generated story content."""
@@ -300,28 +515,21 @@ Write the complete story now:"""
         if not content.startswith("#"):
             content = f"# The Adventure\n\n{content}"
 
-        # Clean up formatting
-        lines = content.split("\n")
-        formatted_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if line:
-                formatted_lines.append(line)
-            else:
-                formatted_lines.append("")
-
-        # Join lines and clean up multiple empty lines
-        formatted_content = "\n".join(formatted_lines)
-        formatted_content = re.sub(r"\n\s*\n\s*\n", "\n\n", formatted_content)
-
-        return formatted_content
+        # Strip every line, then collapse runs of blank lines
+        content = _LINE_EDGE_WHITESPACE_RE.sub("", content)
+        # Well-formed output has no runs to collapse; a substring check
+        # is far cheaper than a regex scan
+        if "\n\n\n" not in content:
+            return content
+        return _BLANK_LINE_RUN_RE.sub("\n\n", content)
 
     def _fallback_story(self, context: StoryContext, outline: str) -> str:
         """Generate a basic fallback story when OpenAI fails."""
-        # Extract main character
-        characters = [e for e in context.entities.values() if e.type == "character"]
-        main_character = characters[0].name if characters else "The Hero"
+        # Extract main character without building the full character list
+        main_character = next(
+            (e.name for e in context.entities.values() if e.type == "character"),
+            "The Hero",
+        )
 
         # Get plot points
         plot_points = context.plot_points
@@ -350,19 +558,16 @@ The End.
         if not outline_path.exists():
             raise FileNotFoundError(f"Outline file not found: {outline_file}")
 
-        with open(outline_path, encoding="utf-8") as f:
-            return f.read()
+        return outline_path.read_text(encoding="utf-8")
 
     def load_context_from_file(self, context_file: str) -> StoryContext:
         """Load a StoryContext from a YAML file."""
-        import yaml
-
         context_path = Path(context_file)
         if not context_path.exists():
             raise FileNotFoundError(f"Context file not found: {context_file}")
 
-        with open(context_path, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        # The YAML reader detects the encoding itself, so skip text decoding
+        data = yaml.load(context_path.read_bytes(), Loader=_YamlLoader)
 
         return StoryContext(**data)
 
@@ -370,9 +575,7 @@ The End.
         """Save the story to a markdown file."""
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(story)
+        output_path.write_text(story, encoding="utf-8")
 
     def update_context_with_story(self, context: StoryContext, story: str) -> None:
         """Update the context with the generated story."""
@@ -382,9 +585,7 @@ The End.
     def calculate_word_count(self, text: str) -> int:
         """Calculate word count for the given text."""
         # Remove markdown formatting and count words
-        clean_text = re.sub(r"[#*_`\[\]()]", "", text)
-        words = clean_text.split()
-        return len(words)
+        return len(text.translate(_MARKDOWN_DELETE_TABLE).split())
 
     def calculate_reading_time(self, word_count: int) -> str:
         """Calculate estimated reading time in minutes."""
@@ -2,12 +2,36 @@
 
 import re
 import time
-from dataclasses import dataclass
-from pathlib import Path
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 
 from .template_loader import TemplateLoader
 
+# Upper bound on cached analyses kept per debugger instance
+_ANALYSIS_CACHE_MAX_SIZE = 256
+
+# A {{variable}} placeholder, capturing everything between the braces
+_VARIABLE_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+# A placeholder that appears to contain another placeholder
+_NESTED_VARIABLE_RE = re.compile(r"\{\{[^}]*\s+\{\{[^}]*\}\}[^}]*\}\}")
+
+
+@dataclass(frozen=True, slots=True)
+class PerformanceMetrics:
+    """Size and variable metrics for a template."""
+
+    template_size_bytes: int = 0
+    template_size_chars: int = 0
+    line_count: int = 0
+    variable_count: int = 0
+    average_variable_length: float = 0.0
+    max_variable_length: int = 0
+    documentation_coverage: float = 0.0
+    repeated_variables: int = 0
+    estimated_rendering_time_ms: float = 0.0
+
 
 @dataclass
 class TemplateAnalysis:
@@ -19,7 +43,8 @@ class TemplateAnalysis:
     complexity_score: float
     potential_issues: list[str]
     recommendations: list[str]
-    performance_metrics: dict[str, Any]
+    performance_metrics: PerformanceMetrics
+    variables: list[dict[str, Any]] = field(default_factory=list)
 
 
 class TemplateDebugger:
@@ -28,7 +53,10 @@ class TemplateDebugger:
     def __init__(self, template_loader: TemplateLoader | None = None):
         """Initialize the template debugger."""
         self.template_loader = template_loader or TemplateLoader()
-        self._analysis_cache: dict[str, TemplateAnalysis] = {}
+        # Analyses keyed by template file, stored with the file's mtime
+        self._analysis_cache: OrderedDict[str, tuple[int, TemplateAnalysis]] = (
+            OrderedDict()
+        )
 
     def analyze_template(
         self,
@@ -36,10 +64,24 @@ class TemplateDebugger:
         force_refresh: bool = False,
     ) -> TemplateAnalysis:
         """Perform comprehensive analysis of a template."""
-        cache_key = str(Path(template_path).resolve())
+        # Cached analyses are reused until the template file's mtime changes
+        template_file = self.template_loader.templates_dir / template_path
+        cache_key = str(template_file)
+        try:
+            mtime_ns: int | None = template_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if not force_refresh and mtime_ns is not None:
+            cached = self._get_cached_analysis(cache_key, mtime_ns)
+            if cached is not None:
+                return cached
 
-        if not force_refresh and cache_key in self._analysis_cache:
-            return self._analysis_cache[cache_key]
+        # The loader caches template text without checking the file, so a
+        # template edited since its last analysis must be re-read from disk
+        previous = self._analysis_cache.get(cache_key)
+        if previous is not None and previous[0] != mtime_ns:
+            self.template_loader.invalidate_template(template_path)
 
         start_time = time.time()
 
@@ -50,10 +92,14 @@ class TemplateDebugger:
             # Analyze variables
             variables = self._analyze_variables(template_content)
 
+            # Split once; several checks below need the line count
+            line_count = len(template_content.splitlines())
+
             # Calculate complexity score
             complexity_score = self._calculate_complexity_score(
                 template_content,
                 variables,
+                line_count,
             )
 
             # Identify potential issues
@@ -67,12 +113,14 @@ class TemplateDebugger:
                 template_content,
                 variables,
                 potential_issues,
+                line_count,
             )
 
             # Performance metrics
             performance_metrics = self._calculate_performance_metrics(
                 template_content,
                 variables,
+                line_count,
             )
 
             analysis_time = time.time() - start_time
@@ -85,10 +133,12 @@ class TemplateDebugger:
                 potential_issues=potential_issues,
                 recommendations=recommendations,
                 performance_metrics=performance_metrics,
+                variables=variables,
             )
 
             # Cache the analysis
-            self._analysis_cache[cache_key] = analysis
+            if mtime_ns is not None:
+                self._cache_analysis(cache_key, mtime_ns, analysis)
 
             return analysis
 
@@ -101,31 +151,58 @@ class TemplateDebugger:
                 complexity_score=0.0,
                 potential_issues=[f"Analysis failed: {e}"],
                 recommendations=["Fix template loading issues before analysis"],
-                performance_metrics={},
+                performance_metrics=PerformanceMetrics(),
             )
 
+    def _get_cached_analysis(
+        self,
+        cache_key: str,
+        mtime_ns: int,
+    ) -> TemplateAnalysis | None:
+        """Return a cached analysis if the file is unchanged since it was made."""
+        cached = self._analysis_cache.get(cache_key)
+        if cached is None or cached[0] != mtime_ns:
+            return None
+        self._analysis_cache.move_to_end(cache_key)
+        return cached[1]
+
+    def _cache_analysis(
+        self,
+        cache_key: str,
+        mtime_ns: int,
+        analysis: TemplateAnalysis,
+    ) -> None:
+        """Store an analysis, evicting the least recently used entry."""
+        self._analysis_cache[cache_key] = (mtime_ns, analysis)
+        self._analysis_cache.move_to_end(cache_key)
+        if len(self._analysis_cache) > _ANALYSIS_CACHE_MAX_SIZE:
+            self._analysis_cache.popitem(last=False)
+
     def _analyze_variables(self, template_content: str) -> list[dict[str, Any]]:
         """Analyze template variables in detail."""
-        pattern = r"\{\{([^}]+)\}\}"
-        found_vars_raw = re.findall(pattern, template_content)
+        found_vars_raw = _VARIABLE_RE.findall(template_content)
+        # One scan counts every placeholder instead of one scan per variable
+        usage_counts = Counter(found_vars_raw)
+
+        # Placeholders repeat, so check each distinct name's conventions once
+        naming_issues_by_name: dict[str, list[str]] = {}
 
         variables = []
         for var in found_vars_raw:
-            var_name = var.split("#")[0].strip()
-            has_doc = "#" in var
-            documentation = var.split("#")[1].strip() if has_doc else None
+            # "name # documentation"; text after a second "#" is ignored
+            var_name, separator, doc_text = var.partition("#")
+            var_name = var_name.strip()
+            has_doc = bool(separator)
+            documentation = doc_text.partition("#")[0].strip() if has_doc else None
 
             # Analyze variable usage patterns
-            usage_count = template_content.count(f"{{{{{var}}}}}")
+            usage_count = usage_counts[var]
 
             # Check for naming conventions
-            naming_issues = []
-            if " " in var_name:
-                naming_issues.append("contains spaces")
-            if var_name.startswith("_") or var_name.endswith("_"):
-                naming_issues.append("starts/ends with underscore")
-            if not var_name.replace("_", "").replace("-", "").isalnum():
-                naming_issues.append("contains special characters")
+            naming_issues = naming_issues_by_name.get(var_name)
+            if naming_issues is None:
+                naming_issues = self._check_variable_naming(var_name)
+                naming_issues_by_name[var_name] = naming_issues
 
             variables.append(
                 {
@@ -134,7 +211,7 @@ class TemplateDebugger:
                     "has_documentation": has_doc,
                     "documentation": documentation,
                     "usage_count": usage_count,
-                    "naming_issues": naming_issues,
+                    "naming_issues": naming_issues.copy(),
                     "is_required": not var_name.startswith("optional_"),
                     "is_conditional": "if_" in var_name or "when_" in var_name,
                 },
@@ -142,10 +219,22 @@ class TemplateDebugger:
 
         return variables
 
+    def _check_variable_naming(self, var_name: str) -> list[str]:
+        """List the naming convention problems with a variable name."""
+        naming_issues = []
+        if " " in var_name:
+            naming_issues.append("contains spaces")
+        if var_name.startswith("_") or var_name.endswith("_"):
+            naming_issues.append("starts/ends with underscore")
+        if not var_name.replace("_", "").replace("-", "").isalnum():
+            naming_issues.append("contains special characters")
+        return naming_issues
+
     def _calculate_complexity_score(
         self,
         template_content: str,
         variables: list[dict[str, Any]],
+        line_count: int,
     ) -> float:
         """Calculate template complexity score (0-100)."""
         score = 0.0
@@ -161,13 +250,13 @@ class TemplateDebugger:
             score += 10
 
         # Line complexity
-        line_count = len(template_content.splitlines())
         if line_count > 20:
             score += 5
         if line_count > 50:
             score += 5
 
-        # Variable complexity
+        # Variable complexity; every term adds to the score, so stop
+        # scanning once it reaches the cap
         for var in variables:
             if var["usage_count"] > 3:
                 score += 2  # Repeated variables
@@ -175,11 +264,13 @@ class TemplateDebugger:
                 score += 1  # Naming issues
             if not var["has_documentation"]:
                 score += 0.5  # Missing documentation
+            if score >= 100.0:
+                return 100.0
 
         # Nested structure complexity
         if "{{" in template_content and "}}" in template_content:
             # Check for complex patterns
-            if re.search(r"\{\{[^}]*\s+\{\{[^}]*\}\}[^}]*\}\}", template_content):
+            if _NESTED_VARIABLE_RE.search(template_content):
                 score += 15  # Nested patterns (even if not supported)
 
         return min(score, 100.0)
@@ -219,8 +310,8 @@ class TemplateDebugger:
             issues.append("Template has many variables (>20) - consider simplifying")
 
         # Duplicate variables
-        var_names = [var["name"] for var in variables]
-        duplicates = [name for name in set(var_names) if var_names.count(name) > 1]
+        name_counts = Counter(var["name"] for var in variables)
+        duplicates = [name for name, count in name_counts.items() if count > 1]
         if duplicates:
             issues.append(f"Duplicate variable names: {', '.join(duplicates)}")
 
@@ -236,6 +327,7 @@ class TemplateDebugger:
         template_content: str,
         variables: list[dict[str, Any]],
         issues: list[str],
+        line_count: int,
     ) -> list[str]:
         """Generate recommendations for improving the template."""
         recommendations = []
@@ -282,7 +374,7 @@ class TemplateDebugger:
             )
 
         # Organization recommendations
-        if len(template_content.splitlines()) > 30:
+        if line_count > 30:
             recommendations.append(
                 "Consider organizing template into logical sections with comments",
             )
@@ -293,30 +385,47 @@ class TemplateDebugger:
         self,
         template_content: str,
         variables: list[dict[str, Any]],
-    ) -> dict[str, Any]:
+        line_count: int,
+    ) -> PerformanceMetrics:
         """Calculate performance-related metrics."""
-        return {
-            "template_size_bytes": len(template_content.encode("utf-8")),
-            "template_size_chars": len(template_content),
-            "line_count": len(template_content.splitlines()),
-            "variable_count": len(variables),
-            "average_variable_length": sum(len(var["name"]) for var in variables)
-            / len(variables)
-            if variables
-            else 0,
-            "max_variable_length": max(len(var["name"]) for var in variables)
+        # Gather the per-variable totals in one pass over the variables
+        total_name_length = 0
+        max_name_length = 0
+        documented_count = 0
+        repeated_count = 0
+        for var in variables:
+            name_length = len(var["name"])
+            total_name_length += name_length
+            max_name_length = max(max_name_length, name_length)
+            if var["has_documentation"]:
+                documented_count += 1
+            if var["usage_count"] > 1:
+                repeated_count += 1
+
+        # ASCII text is one byte per character, so skip encoding a copy
+        size_bytes = (
+            len(template_content)
+            if template_content.isascii()
+            else len(template_content.encode("utf-8"))
+        )
+
+        variable_count = len(variables)
+        return PerformanceMetrics(
+            template_size_bytes=size_bytes,
+            template_size_chars=len(template_content),
+            line_count=line_count,
+            variable_count=variable_count,
+            average_variable_length=total_name_length / variable_count
             if variables
-            else 0,
-            "documentation_coverage": sum(
-                1 for var in variables if var["has_documentation"]
-            )
-            / len(variables)
+            else 0.0,
+            max_variable_length=max_name_length,
+            documentation_coverage=documented_count / variable_count
             if variables
-            else 0,
-            "repeated_variables": sum(1 for var in variables if var["usage_count"] > 1),
-            "estimated_rendering_time_ms": len(template_content) * 0.001
-            + len(variables) * 0.1,  # Rough estimate
-        }
+            else 0.0,
+            repeated_variables=repeated_count,
+            estimated_rendering_time_ms=len(template_content) * 0.001
+            + variable_count * 0.1,  # Rough estimate
+        )
 
     def debug_template_rendering(
         self,
@@ -327,26 +436,23 @@ class TemplateDebugger:
         start_time = time.time()
 
         try:
-            # Test rendering
-            rendered = self.template_loader.render_template(template_path, context)
+            # Test rendering; a cached render would not measure anything
+            rendered = self.template_loader.render_template(
+                template_path,
+                context,
+                use_cache=False,
+            )
             rendering_time = time.time() - start_time
 
             # Analyze results
-            unresolved_vars = re.findall(r"\{\{([^}]+)\}\}", rendered)
+            unresolved_vars = _VARIABLE_RE.findall(rendered)
 
-            # Calculate coverage
-            template_analysis = self.analyze_template(template_path)
-            # Get variables from the template analysis - we need to re-analyze to get variables
-            variables = self._analyze_variables(
-                self.template_loader.load_template(template_path),
-            )
+            # Calculate coverage from the (cached) template analysis
+            variables = self.analyze_template(template_path).variables
             template_vars = {var["name"] for var in variables}
-            context_vars = set(context.keys())
-            coverage = (
-                len(template_vars & context_vars) / len(template_vars)
-                if template_vars
-                else 1.0
-            )
+            # Probe the context dict directly instead of copying its keys
+            variables_used = len(template_vars.intersection(context))
+            coverage = variables_used / len(template_vars) if template_vars else 1.0
 
             return {
                 "success": True,
@@ -354,7 +460,7 @@ class TemplateDebugger:
                 "rendered_length": len(rendered),
                 "unresolved_variables": unresolved_vars,
                 "context_coverage": coverage,
-                "variables_used": len(template_vars & context_vars),
+                "variables_used": variables_used,
                 "variables_total": len(template_vars),
                 "performance_score": self._calculate_rendering_performance_score(
                     rendering_time,
@@ -414,25 +520,20 @@ class TemplateDebugger:
 
     def _find_common_issues(self, analyses: list[TemplateAnalysis]) -> list[str]:
         """Find common issues across multiple template analyses."""
-        all_issues = []
-        for analysis in analyses:
-            all_issues.extend(analysis.potential_issues)
-
         # Count issue frequency
-        issue_counts: dict[str, int] = {}
-        for issue in all_issues:
-            issue_counts[issue] = issue_counts.get(issue, 0) + 1
+        issue_counts = Counter(
+            issue for analysis in analyses for issue in analysis.potential_issues
+        )
 
-        # Return issues that appear in multiple templates
-        common_issues = [issue for issue, count in issue_counts.items() if count > 1]
-        return sorted(common_issues, key=lambda x: issue_counts[x], reverse=True)
+        # Return issues that appear in multiple templates, most frequent first
+        return [issue for issue, count in issue_counts.most_common() if count > 1]
 
     def _compare_performance(self, analyses: list[TemplateAnalysis]) -> dict[str, Any]:
         """Compare performance metrics across templates."""
         if not analyses:
             return {}
 
-        sizes = [a.performance_metrics.get("template_size_bytes", 0) for a in analyses]
+        sizes = [a.performance_metrics.template_size_bytes for a in analyses]
         variables = [a.variable_count for a in analyses]
         complexities = [a.complexity_score for a in analyses]
 
@@ -442,7 +543,7 @@ class TemplateDebugger:
             "complexity_range": (min(complexities), max(complexities)),
             "largest_template": max(
                 analyses,
-                key=lambda a: a.performance_metrics.get("template_size_bytes", 0),
+                key=lambda a: a.performance_metrics.template_size_bytes,
             ).template_path,
             "most_complex": max(
                 analyses,
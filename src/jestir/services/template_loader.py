@@ -1,14 +1,58 @@
 """Template loading service for prompt management."""
 
-import contextlib
 import logging
+import os
 import re
+import sys
 import time
+from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
+record_template_metrics: Callable[..., None] | None
+try:
+    from .template_monitor import record_template_metrics
+except ImportError:
+    # Monitoring not available, metrics are skipped silently
+    record_template_metrics = None
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on rendered outputs kept per loader instance
+_RENDER_CACHE_MAX_SIZE = 256
+
+# A {{variable}} placeholder, capturing everything between the braces
+_VARIABLE_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+# Like _VARIABLE_RE, but also matches empty {{}} placeholders
+_VARIABLE_OR_EMPTY_RE = re.compile(r"\{\{([^}]*)\}\}")
+
+# A placeholder that appears to contain another placeholder
+_NESTED_VARIABLE_RE = re.compile(r"\{\{[^}]*\{\{[^}]*\}\}[^}]*\}\}")
+
+# Sentinel for context lookups, since None is a valid (empty) context value
+_MISSING = object()
+
+# Upper bound on str.format_map conversions kept per loader instance
+_FORMAT_CACHE_MAX_SIZE = 256
+
+
+class _FormatContext:
+    """Mapping for str.format_map that resolves values like _substitute_variables."""
+
+    __slots__ = ("_context",)
+
+    def __init__(self, context: dict[str, Any]):
+        self._context = context
+
+    def __getitem__(self, key: str) -> str:
+        value = self._context.get(key, _MISSING)
+        if value is _MISSING:
+            logger.warning(f"Template variable '{key}' not found in context")
+            return f"{{{{{key}}}}}"
+        return "" if value is None else str(value)
+
 
 class TemplateLoader:
     """Loads and processes templates with variable substitution."""
@@ -22,11 +66,27 @@ class TemplateLoader:
 
         self.templates_dir = Path(templates_dir)
         self._template_cache: dict[str, str] = {}
+        # (template_path, sorted stringified context) -> (template size, text)
+        self._render_cache: OrderedDict[
+            tuple[str, tuple[tuple[str, str], ...]],
+            tuple[int, str],
+        ] = OrderedDict()
+        # template text -> str.format_map equivalent, or None if not convertible
+        self._format_cache: OrderedDict[str, str | None] = OrderedDict()
+        # Category listing, reused while the category directory mtimes match
+        self._templates_listing: dict[str, list] | None = None
+        self._templates_listing_mtimes: tuple[int | None, ...] = ()
 
     def load_template(self, template_path: str) -> str:
         """Load a template from file with caching."""
         template_file = self.templates_dir / template_path
 
+        # Check cache first; hits skip the filesystem entirely
+        cache_key = str(template_file)
+        cached = self._template_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         if not template_file.exists():
             available_templates = self._get_available_template_list()
             raise FileNotFoundError(
@@ -35,15 +95,9 @@ class TemplateLoader:
                 f"Available templates: {available_templates}",
             )
 
-        # Check cache first
-        cache_key = str(template_file)
-        if cache_key in self._template_cache:
-            return self._template_cache[cache_key]
-
         try:
             # Load template
-            with open(template_file, encoding="utf-8") as f:
-                content = f.read()
+            content = template_file.read_text(encoding="utf-8")
 
             # Cache the template
             self._template_cache[cache_key] = content
@@ -60,22 +114,49 @@ class TemplateLoader:
                 f"Template files must be UTF-8 encoded. Error: {e}",
             )
 
-    def render_template(self, template_path: str, context: dict[str, Any]) -> str:
+    def render_template(
+        self,
+        template_path: str,
+        context: dict[str, Any],
+        *,
+        use_cache: bool = True,
+    ) -> str:
         """Render a template with variable substitution."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        # Known as soon as the template loads, so failures can report it
+        template_size = 0
 
         try:
-            template_content = self.load_template(template_path)
-            result = self._substitute_variables(template_content, context)
+            render_key = (
+                self._render_cache_key(template_path, context) if use_cache else None
+            )
+            cached = (
+                self._render_cache.get(render_key) if render_key is not None else None
+            )
+            if render_key is not None and cached is not None:
+                self._render_cache.move_to_end(render_key)
+                template_size, result = cached
+            else:
+                template_content = self.load_template(template_path)
+                template_size = len(template_content)
+                result = self._substitute_variables(template_content, context)
+                # Renders with missing variables are redone so each one warns
+                if render_key is not None and not self._has_missing_variables(
+                    template_content,
+                    context,
+                ):
+                    self._render_cache[render_key] = (template_size, result)
+                    if len(self._render_cache) > _RENDER_CACHE_MAX_SIZE:
+                        self._render_cache.popitem(last=False)
 
             # Record successful metrics
             processing_time = (
-                time.time() - start_time
-            ) * 1000  # Convert to milliseconds
+                time.perf_counter_ns() - start_ns
+            ) / 1_000_000  # Convert to milliseconds
             self._record_template_metrics(
                 template_path,
                 processing_time,
-                len(template_content),
+                template_size,
                 len(context),
                 success=True,
             )
@@ -84,15 +165,11 @@ class TemplateLoader:
 
         except Exception as e:
             # Record failed metrics
-            processing_time = (time.time() - start_time) * 1000
-            template_content = ""
-            with contextlib.suppress(BaseException):
-                template_content = self.load_template(template_path)
-
+            processing_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             self._record_template_metrics(
                 template_path,
                 processing_time,
-                len(template_content),
+                template_size,
                 len(context),
                 success=False,
                 error_type=type(e).__name__,
@@ -100,25 +177,153 @@ class TemplateLoader:
             )
             raise
 
+    def render_many(
+        self,
+        template_paths: list[str],
+        context: dict[str, Any],
+    ) -> list[str]:
+        """Render several templates against one shared context."""
+        # Convert the context once instead of per placeholder per template
+        context_strings = {
+            key: "" if value is None else str(value) for key, value in context.items()
+        }
+
+        rendered = []
+        for template_path in template_paths:
+            start_ns = time.perf_counter_ns()
+            template_size = 0
+            try:
+                template_content = self.load_template(template_path)
+                template_size = len(template_content)
+                rendered.append(
+                    self._substitute_strings(template_content, context_strings),
+                )
+            except Exception as e:
+                processing_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+                self._record_template_metrics(
+                    template_path,
+                    processing_time,
+                    template_size,
+                    len(context),
+                    success=False,
+                    error_type=type(e).__name__,
+                    error_message=str(e),
+                )
+                raise
+
+            processing_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+            self._record_template_metrics(
+                template_path,
+                processing_time,
+                template_size,
+                len(context),
+                success=True,
+            )
+
+        return rendered
+
+    def _render_cache_key(
+        self,
+        template_path: str,
+        context: dict[str, Any],
+    ) -> tuple[str, tuple[tuple[str, str], ...]] | None:
+        """Build a render cache key, or None if the context cannot be keyed."""
+        # Keying on raw values would let 1, 1.0 and True share an entry
+        try:
+            context_strings = tuple(
+                sorted(
+                    (key, "" if value is None else str(value))
+                    for key, value in context.items()
+                ),
+            )
+        except Exception:
+            # Unsortable keys or a failing __str__; render without caching
+            return None
+        return template_path, context_strings
+
+    def _has_missing_variables(self, template: str, context: dict[str, Any]) -> bool:
+        """Check whether any {{key}} placeholder has no value in the context."""
+        if "{{" not in template:
+            return False
+        return any(
+            full_key.partition("#")[0].strip() not in context
+            for full_key in _VARIABLE_RE.findall(template)
+        )
+
     def _substitute_variables(self, template: str, context: dict[str, Any]) -> str:
         """Substitute {{key}} variables in template with context values."""
+        # Static templates have nothing to substitute
+        if "{{" not in template:
+            return template
+
+        format_string = self._get_format_string(template)
+        if format_string is not None:
+            return format_string.format_map(_FormatContext(context))
 
         def replace_variable(match):
             full_key = match.group(1)
             # Extract the actual variable name (before # if present)
-            key = full_key.split("#")[0].strip()
-            if key in context:
-                value = context[key]
-                # Convert to string and handle None values
-                if value is None:
-                    return ""
-                return str(value)
-            logger.warning(f"Template variable '{key}' not found in context")
-            return f"{{{{{full_key}}}}}"  # Keep the original placeholder with documentation
+            key = full_key.partition("#")[0].strip()
+            value = context.get(key, _MISSING)
+            if value is _MISSING:
+                logger.warning(f"Template variable '{key}' not found in context")
+                return f"{{{{{full_key}}}}}"  # Keep the original placeholder with documentation
+            # Convert to string and handle None values
+            return "" if value is None else str(value)
+
+        return _VARIABLE_RE.sub(replace_variable, template)
+
+    def _get_format_string(self, template: str) -> str | None:
+        """Get the cached str.format_map form of a template, if it has one."""
+        if template in self._format_cache:
+            self._format_cache.move_to_end(template)
+            return self._format_cache[template]
+
+        format_string = self._build_format_string(template)
+        self._format_cache[template] = format_string
+        if len(self._format_cache) > _FORMAT_CACHE_MAX_SIZE:
+            self._format_cache.popitem(last=False)
+        return format_string
+
+    def _build_format_string(self, template: str) -> str | None:
+        """Convert {{key}} placeholders to {key} with literal braces escaped.
+
+        Returns None unless every placeholder is a bare identifier, since
+        documentation, padding or dotted names mean something else to
+        str.format.
+        """
+        parts = []
+        position = 0
+        for match in _VARIABLE_RE.finditer(template):
+            key = match.group(1)
+            if not key.isidentifier():
+                return None
+            literal = template[position : match.start()]
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            parts.append(f"{{{key}}}")
+            position = match.end()
+        literal = template[position:]
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        return "".join(parts)
+
+    def _substitute_strings(
+        self,
+        template: str,
+        context_strings: dict[str, str],
+    ) -> str:
+        """Substitute {{key}} variables from already-stringified context values."""
+        if "{{" not in template:
+            return template
+
+        def replace_variable(match):
+            key = match.group(1).partition("#")[0].strip()
+            value = context_strings.get(key)
+            if value is None:
+                logger.warning(f"Template variable '{key}' not found in context")
+                return match.group(0)  # Keep the original placeholder
+            return value
 
-        # Pattern to match {{key}} variables (including those with # documentation)
-        pattern = r"\{\{([^}]+)\}\}"
-        return re.sub(pattern, replace_variable, template)
+        return _VARIABLE_RE.sub(replace_variable, template)
 
     def _record_template_metrics(
         self,
@@ -131,9 +336,7 @@ class TemplateLoader:
         error_message: str | None = None,
     ) -> None:
         """Record template processing metrics."""
-        try:
-            from .template_monitor import record_template_metrics
-
+        if record_template_metrics is not None:
             record_template_metrics(
                 template_path,
                 processing_time_ms,
@@ -143,9 +346,6 @@ class TemplateLoader:
                 error_type,
                 error_message,
             )
-        except ImportError:
-            # Monitoring not available, skip silently
-            pass
 
     def load_character_template(self, character_type: str) -> str:
         """Load a character-specific template."""
@@ -167,9 +367,18 @@ class TemplateLoader:
         template_path = f"prompts/user_prompts/{prompt_type}.txt"
         return self.load_template(template_path)
 
+    def invalidate_template(self, template_path: str) -> None:
+        """Drop the cached text and rendered outputs of one template."""
+        self._template_cache.pop(str(self.templates_dir / template_path), None)
+        for render_key in [k for k in self._render_cache if k[0] == template_path]:
+            del self._render_cache[render_key]
+
     def clear_cache(self) -> None:
-        """Clear the template cache."""
+        """Clear the template, render, format and listing caches."""
         self._template_cache.clear()
+        self._render_cache.clear()
+        self._format_cache.clear()
+        self._templates_listing = None
 
     def get_available_templates(self) -> dict[str, list]:
         """Get list of available templates by category."""
@@ -178,15 +387,45 @@ class TemplateLoader:
             "user_prompts": [],
             "includes": [],
         }
+        category_dirs = [
+            self.templates_dir / "prompts" / category for category in templates
+        ]
+
+        # Adding, removing or renaming a template changes its directory's mtime
+        mtimes = tuple(self._get_directory_mtime(path) for path in category_dirs)
+        if (
+            self._templates_listing is not None
+            and mtimes == self._templates_listing_mtimes
+        ):
+            return {
+                category: list(names)
+                for category, names in self._templates_listing.items()
+            }
 
-        for category in templates:
-            category_dir = self.templates_dir / "prompts" / category
-            if category_dir.exists():
-                for file_path in category_dir.glob("*.txt"):
-                    templates[category].append(file_path.stem)
-
+        for category, category_dir in zip(templates, category_dirs, strict=True):
+            try:
+                with os.scandir(category_dir) as entries:
+                    templates[category] = [
+                        entry.name.removesuffix(".txt")
+                        for entry in entries
+                        if entry.name.endswith(".txt") and entry.is_file()
+                    ]
+            except OSError:
+                continue
+
+        self._templates_listing = {
+            category: list(names) for category, names in templates.items()
+        }
+        self._templates_listing_mtimes = mtimes
         return templates
 
+    def _get_directory_mtime(self, directory: Path) -> int | None:
+        """Get a directory's modification time, or None if it does not exist."""
+        try:
+            return directory.stat().st_mtime_ns
+        except OSError:
+            return None
+
     def validate_template(
         self,
         template_path: str,
@@ -195,19 +434,23 @@ class TemplateLoader:
         """Validate that a template has all required variables."""
         template_content = self.load_template(template_path)
 
-        # Find all variables in template
-        pattern = r"\{\{([^}]+)\}\}"
-        found_vars_raw = re.findall(pattern, template_content)
+        # Find all variables in template, skipping the scan for static ones
+        found_vars_raw = (
+            _VARIABLE_RE.findall(template_content) if "{{" in template_content else []
+        )
 
         # Extract variable names (before # if present)
         found_vars = set()
         for var in found_vars_raw:
-            var_name = var.split("#")[0].strip()
+            # Interned so set operations against context keys hit the identity
+            # fast path
+            var_name = sys.intern(var.partition("#")[0].strip())
             found_vars.add(var_name)
 
         # Check for missing required variables
-        missing_vars = set(required_vars) - found_vars
-        extra_vars = found_vars - set(required_vars)
+        required = set(required_vars)
+        missing_vars = required - found_vars
+        extra_vars = found_vars - required
 
         return {
             "valid": len(missing_vars) == 0,
@@ -229,23 +472,35 @@ class TemplateLoader:
                 "warnings": [],
             }
 
+        return self._analyze_template_syntax(template_content)
+
+    def _analyze_template_syntax(self, template_content: str) -> dict[str, Any]:
+        """Check already-loaded template text for syntax errors and warnings."""
         syntax_errors = []
         warnings = []
         variables = []
 
         # Find all variables in template (including empty ones)
-        pattern = r"\{\{([^}]*)\}\}"
-        found_vars_raw = re.findall(pattern, template_content)
+        found_vars_raw = (
+            _VARIABLE_OR_EMPTY_RE.findall(template_content)
+            if "{{" in template_content
+            else []
+        )
 
         # Analyze each variable
         for var in found_vars_raw:
-            var_name = var.split("#")[0].strip()
+            # "name # documentation"; text after a second "#" is ignored
+            var_name, separator, doc_text = var.partition("#")
+            var_name = sys.intern(var_name.strip())
+            has_doc = bool(separator)
             variables.append(
                 {
                     "raw": var,
                     "name": var_name,
-                    "has_documentation": "#" in var,
-                    "documentation": var.split("#")[1].strip() if "#" in var else None,
+                    "has_documentation": has_doc,
+                    "documentation": doc_text.partition("#")[0].strip()
+                    if has_doc
+                    else None,
                 },
             )
 
@@ -273,22 +528,35 @@ class TemplateLoader:
                 f"Mismatched braces: {open_braces} opening, {close_braces} closing",
             )
 
-        # Check for nested braces (not supported)
-        nested_pattern = r"\{\{[^}]*\{\{[^}]*\}\}[^}]*\}\}"
-        if re.search(nested_pattern, template_content):
+        # Check for nested braces (not supported); a nested placeholder needs
+        # at least two of each delimiter, so skip the scan otherwise
+        if (
+            open_braces > 1
+            and close_braces > 1
+            and _NESTED_VARIABLE_RE.search(template_content)
+        ):
             syntax_errors.append("Nested braces detected - this is not supported")
 
-        # Check for common typos
+        # Check for common typos, which only apply when the correct delimiter
+        # never appears in the template
         common_typos = {
-            "{{": ["{", "{[", "{{{"],
-            "}}": ["}", "}]", "}}}"],
+            "{{": (open_braces, ["{", "{[", "{{{"]),
+            "}}": (close_braces, ["}", "}]", "}}}"]),
         }
 
-        for correct, typos in common_typos.items():
+        for correct, (correct_count, typos) in common_typos.items():
+            if correct_count:
+                continue
             for typo in typos:
-                if typo in template_content and correct not in template_content:
+                if typo in template_content:
                     warnings.append(f"Possible typo: '{typo}' should be '{correct}'")
 
+        # Count lines without building a splitlines() list; files are read with
+        # universal newlines, so "\n" is the only line ending left
+        line_count = template_content.count("\n")
+        if template_content and not template_content.endswith("\n"):
+            line_count += 1
+
         return {
             "valid": len(syntax_errors) == 0,
             "syntax_errors": syntax_errors,
@@ -296,7 +564,7 @@ class TemplateLoader:
             "variables": variables,
             "variable_count": len(variables),
             "template_length": len(template_content),
-            "line_count": len(template_content.splitlines()),
+            "line_count": line_count,
         }
 
     def validate_template_with_context(
@@ -325,16 +593,17 @@ class TemplateLoader:
             missing_required = set(required_vars) - template_vars
 
         # Check context coverage
-        missing_in_context = template_vars - set(context.keys())
-        extra_in_context = set(context.keys()) - template_vars
+        # Key views support set operations directly, so no set() copies
+        context_keys = context.keys()
+        missing_in_context = template_vars - context_keys
+        extra_in_context = context_keys - template_vars
 
         # Test rendering
         rendering_errors = []
         try:
             rendered = self.render_template(template_path, context)
             # Check for unresolved variables after rendering
-            pattern = r"\{\{([^}]+)\}\}"
-            unresolved = re.findall(pattern, rendered)
+            unresolved = _VARIABLE_RE.findall(rendered)
             if unresolved:
                 rendering_errors.append(
                     f"Unresolved variables after rendering: {unresolved}",
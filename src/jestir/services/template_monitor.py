@@ -3,13 +3,23 @@
 import json
 import logging
 import time
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Number of most recent metrics the summaries and rolling error rate cover
+_RECENT_WINDOW = 100
+
+# Processing times and sizes kept per template for trend detection
+_TEMPLATE_HISTORY_SIZE = 100
+
+# Most recent metrics per template that get_template_performance reports on
+_TEMPLATE_RECENT_METRICS = 50
+
 
 @dataclass
 class TemplateMetrics:
@@ -23,6 +33,12 @@ class TemplateMetrics:
     error_type: str | None = None
     error_message: str | None = None
     timestamp: float = field(default_factory=time.time)
+    # File name metrics are grouped by, parsed once rather than on every scan
+    template_name: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Derive the template name from its path."""
+        self.template_name = Path(self.template_path).name
 
 
 @dataclass
@@ -46,13 +62,32 @@ class TemplateMonitor:
         self.performance_stats: dict[str, Any] = {}
         self.thresholds = PerformanceThresholds()
 
-        # Performance tracking
-        self._processing_times: dict[str, list[float]] = defaultdict(list)
-        self._template_sizes: dict[str, list[int]] = defaultdict(list)
+        # Performance tracking; bounded deques drop the oldest entries themselves
+        self._processing_times: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=_TEMPLATE_HISTORY_SIZE),
+        )
+        self._template_sizes: dict[str, deque[int]] = defaultdict(
+            lambda: deque(maxlen=_TEMPLATE_HISTORY_SIZE),
+        )
         self._error_rates: dict[str, float] = defaultdict(float)
+        # Failures among the last _RECENT_WINDOW metrics, kept incrementally
+        self._recent_failures = 0
+        self._recent_error_types: Counter[str] = Counter()
+        self._recent_error_templates: Counter[str] = Counter()
+        # Each template's newest metrics that are still in metrics_history
+        self._template_metrics: dict[str, deque[TemplateMetrics]] = {}
 
     def record_metrics(self, metrics: TemplateMetrics) -> None:
         """Record template processing metrics."""
+        # The window can't be longer than the history itself
+        window = min(_RECENT_WINDOW, self.max_history)
+        if len(self.metrics_history) >= window > 0:
+            # This metric is about to slide out of the error-rate window
+            self._update_recent_failures(self.metrics_history[-window], -1)
+        self._update_recent_failures(metrics, 1)
+        if len(self.metrics_history) == self.max_history > 0:
+            # The oldest metric is about to be evicted from the history
+            self._forget_template_metric(self.metrics_history[0])
         self.metrics_history.append(metrics)
 
         # Update error counts
@@ -60,57 +95,81 @@ class TemplateMonitor:
             self.error_counts[metrics.error_type] += 1
 
         # Update performance tracking
-        template_key = str(Path(metrics.template_path).name)
+        template_key = metrics.template_name
         self._processing_times[template_key].append(metrics.processing_time_ms)
         self._template_sizes[template_key].append(metrics.template_size_bytes)
-
-        # Keep only recent data (last 100 entries per template)
-        if len(self._processing_times[template_key]) > 100:
-            self._processing_times[template_key] = self._processing_times[template_key][
-                -100:
-            ]
-        if len(self._template_sizes[template_key]) > 100:
-            self._template_sizes[template_key] = self._template_sizes[template_key][
-                -100:
-            ]
-
-        # Update error rates
-        recent_metrics = list(self.metrics_history)[-100:]  # Last 100 metrics
-        if recent_metrics:
-            error_count = sum(1 for m in recent_metrics if not m.success)
-            self._error_rates[template_key] = error_count / len(recent_metrics)
+        if self.max_history > 0:
+            template_metrics = self._template_metrics.get(template_key)
+            if template_metrics is None:
+                template_metrics = deque(maxlen=_TEMPLATE_RECENT_METRICS)
+                self._template_metrics[template_key] = template_metrics
+            template_metrics.append(metrics)
+
+        # Update error rates over the last _RECENT_WINDOW metrics
+        if self.metrics_history:
+            self._error_rates[template_key] = self._recent_failures / min(
+                len(self.metrics_history),
+                window,
+            )
 
         logger.debug(
             f"Recorded metrics for {metrics.template_path}: {metrics.processing_time_ms:.2f}ms",
         )
 
+    def _forget_template_metric(self, metrics: TemplateMetrics) -> None:
+        """Drop a metric leaving the history from its template's recent metrics."""
+        template_metrics = self._template_metrics.get(metrics.template_name)
+        # It is its template's oldest metric, so if still tracked it's leftmost
+        if template_metrics and template_metrics[0] is metrics:
+            template_metrics.popleft()
+            if not template_metrics:
+                del self._template_metrics[metrics.template_name]
+
+    def _update_recent_failures(self, metrics: TemplateMetrics, delta: int) -> None:
+        """Add a failed metric to, or remove it from, the recent-window counters."""
+        if metrics.success:
+            return
+
+        self._recent_failures += delta
+        counted = [(self._recent_error_templates, metrics.template_name)]
+        if metrics.error_type:
+            counted.append((self._recent_error_types, metrics.error_type))
+        for counter, key in counted:
+            counter[key] += delta
+            if counter[key] <= 0:
+                # Drop keys that left the window so the counters stay small
+                del counter[key]
+
+    def _get_recent_metrics(self, count: int) -> list[TemplateMetrics]:
+        """Get the newest metrics, oldest first, without copying the history."""
+        recent_metrics = list(islice(reversed(self.metrics_history), count))
+        recent_metrics.reverse()
+        return recent_metrics
+
     def get_performance_summary(self) -> dict[str, Any]:
         """Get overall performance summary."""
         if not self.metrics_history:
             return {"status": "no_data", "message": "No metrics recorded yet"}
 
-        recent_metrics = list(self.metrics_history)[-100:]  # Last 100 metrics
+        recent_metrics = self._get_recent_metrics(_RECENT_WINDOW)
 
-        # Calculate overall statistics
+        # Calculate overall statistics in a single pass
         total_metrics = len(recent_metrics)
-        successful_metrics = [m for m in recent_metrics if m.success]
-        failed_metrics = [m for m in recent_metrics if not m.success]
-
-        success_rate = (
-            len(successful_metrics) / total_metrics if total_metrics > 0 else 0
-        )
+        successful_times = []
+        total_size = 0
+        total_variables = 0
+        for m in recent_metrics:
+            if m.success:
+                successful_times.append(m.processing_time_ms)
+            total_size += m.template_size_bytes
+            total_variables += m.variable_count
+
+        success_rate = len(successful_times) / total_metrics if total_metrics > 0 else 0
         avg_processing_time = (
-            sum(m.processing_time_ms for m in successful_metrics)
-            / len(successful_metrics)
-            if successful_metrics
-            else 0
-        )
-        avg_template_size = (
-            sum(m.template_size_bytes for m in recent_metrics) / total_metrics
-        )
-        avg_variable_count = (
-            sum(m.variable_count for m in recent_metrics) / total_metrics
+            sum(successful_times) / len(successful_times) if successful_times else 0
         )
+        avg_template_size = total_size / total_metrics
+        avg_variable_count = total_variables / total_metrics
 
         # Check for performance issues
         performance_issues = []
@@ -146,20 +205,16 @@ class TemplateMonitor:
 
     def get_template_performance(self, template_path: str) -> dict[str, Any]:
         """Get performance metrics for a specific template."""
-        template_key = str(Path(template_path).name)
-        template_metrics = [
-            m
-            for m in self.metrics_history
-            if str(Path(m.template_path).name) == template_key
-        ]
+        template_key = Path(template_path).name
+        # Last 50 metrics for this template, indexed as they were recorded
+        recent_metrics = list(self._template_metrics.get(template_key, ()))
 
-        if not template_metrics:
+        if not recent_metrics:
             return {
                 "status": "no_data",
                 "message": f"No metrics for template: {template_path}",
             }
 
-        recent_metrics = template_metrics[-50:]  # Last 50 metrics for this template
         successful_metrics = [m for m in recent_metrics if m.success]
 
         if not successful_metrics:
@@ -182,13 +237,13 @@ class TemplateMonitor:
         )
 
         # Performance trends
-        processing_times = self._processing_times.get(template_key, [])
+        processing_times = self._processing_times.get(template_key, ())
         if len(processing_times) >= 10:
-            recent_avg = sum(processing_times[-10:]) / 10
+            # Walk in from the newest end instead of copying the whole deque
+            last_twenty = list(islice(reversed(processing_times), 20))[::-1]
+            recent_avg = sum(last_twenty[-10:]) / 10
             older_avg = (
-                sum(processing_times[-20:-10]) / 10
-                if len(processing_times) >= 20
-                else recent_avg
+                sum(last_twenty[:-10]) / 10 if len(last_twenty) == 20 else recent_avg
             )
             trend = (
                 "improving"
@@ -220,45 +275,29 @@ class TemplateMonitor:
         if not self.metrics_history:
             return {"status": "no_data", "message": "No metrics recorded yet"}
 
-        recent_metrics = list(self.metrics_history)[-100:]  # Last 100 metrics
-        failed_metrics = [m for m in recent_metrics if not m.success]
+        # Error patterns are counted live by record_metrics
+        total_metrics = min(
+            len(self.metrics_history),
+            _RECENT_WINDOW,
+            self.max_history,
+        )
+        failed_count = self._recent_failures
 
-        if not failed_metrics:
+        if not failed_count:
             return {
                 "status": "healthy",
                 "message": "No errors in recent processing",
-                "total_metrics": len(recent_metrics),
+                "total_metrics": total_metrics,
                 "error_rate": 0.0,
             }
 
-        # Analyze error patterns
-        error_types: dict[str, int] = defaultdict(int)
-        error_templates: dict[str, int] = defaultdict(int)
-
-        for metric in failed_metrics:
-            if metric.error_type:
-                error_types[metric.error_type] += 1
-            error_templates[str(Path(metric.template_path).name)] += 1
-
-        # Most common errors
-        most_common_errors = sorted(
-            error_types.items(),
-            key=lambda x: x[1],
-            reverse=True,
-        )[:5]
-        most_problematic_templates = sorted(
-            error_templates.items(),
-            key=lambda x: x[1],
-            reverse=True,
-        )[:5]
-
         return {
             "status": "issues_detected",
-            "total_metrics": len(recent_metrics),
-            "failed_metrics": len(failed_metrics),
-            "error_rate": len(failed_metrics) / len(recent_metrics),
-            "most_common_errors": most_common_errors,
-            "most_problematic_templates": most_problematic_templates,
+            "total_metrics": total_metrics,
+            "failed_metrics": failed_count,
+            "error_rate": failed_count / total_metrics,
+            "most_common_errors": self._recent_error_types.most_common(5),
+            "most_problematic_templates": self._recent_error_templates.most_common(5),
             "error_counts": dict(self.error_counts),
         }
 
@@ -267,7 +306,7 @@ class TemplateMonitor:
         if not self.metrics_history:
             return {"status": "no_data", "message": "No metrics recorded yet"}
 
-        recent_metrics = list(self.metrics_history)[-100:]  # Last 100 metrics
+        recent_metrics = self._get_recent_metrics(_RECENT_WINDOW)
 
         # Analyze template sizes
         template_sizes = [m.template_size_bytes for m in recent_metrics]
@@ -304,7 +343,7 @@ class TemplateMonitor:
             "large_template_threshold": self.thresholds.max_template_size_bytes,
             "large_templates_list": [
                 {
-                    "template": str(Path(m.template_path).name),
+                    "template": m.template_name,
                     "size_bytes": m.template_size_bytes,
                     "variable_count": m.variable_count,
                 }
@@ -330,7 +369,7 @@ class TemplateMonitor:
                     "error_type": m.error_type,
                     "timestamp": m.timestamp,
                 }
-                for m in list(self.metrics_history)[-50:]  # Last 50 metrics
+                for m in self._get_recent_metrics(50)  # Last 50 metrics
             ],
         }
 
@@ -346,6 +385,10 @@ class TemplateMonitor:
         self._processing_times.clear()
         self._template_sizes.clear()
         self._error_rates.clear()
+        self._recent_failures = 0
+        self._recent_error_types.clear()
+        self._recent_error_templates.clear()
+        self._template_metrics.clear()
         logger.info("Cleared all template processing metrics")
 
     def set_thresholds(self, thresholds: PerformanceThresholds) -> None:
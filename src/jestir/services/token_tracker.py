@@ -115,6 +115,9 @@ class TokenTracker:
         completion_tokens: int,
         input_text: str = "",
         output_text: str = "",
+        *,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
     ) -> TokenUsage:
         """Track token usage for a single API call."""
         total_tokens = prompt_tokens + completion_tokens
@@ -132,6 +135,8 @@ class TokenTracker:
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
             total_tokens=total_tokens,
+            cached_tokens=cached_tokens,
+            cache_write_tokens=cache_write_tokens,
             cost_usd=total_cost,
             input_text_length=len(input_text),
             output_text_length=len(output_text),
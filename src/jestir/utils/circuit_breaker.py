@@ -0,0 +1,106 @@
+"""Circuit breaker for calls to external APIs."""
+
+import logging
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency until it has had time to recover.
+
+    Used as a context manager around each call. After ``fail_max``
+    consecutive failures the circuit opens and calls are refused with
+    CircuitOpenError for ``reset_timeout`` seconds. After that exactly one
+    call is let through as a trial while the rest are still refused:
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        fail_max: int = 10,
+        reset_timeout: float = 60.0,
+        failure_types: tuple[type[BaseException], ...] = (Exception,),
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            fail_max: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            failure_types: Exception types counted as failures of the dependency
+        """
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failure_types = failure_types
+        self._failures = 0
+        self._opened_at: float | None = None
+        # Set while the single half-open trial call is running
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused."""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._trial_in_flight
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def __enter__(self) -> "Self":
+        with self._lock:
+            if self._opened_at is not None:
+                cooling_down = time.monotonic() - self._opened_at < self.reset_timeout
+                if cooling_down or self._trial_in_flight:
+                    raise CircuitOpenError(
+                        f"Circuit open after {self._failures} consecutive failures",
+                    )
+                self._trial_in_flight = True
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.record_success()
+        elif issubclass(exc_type, self.failure_types):
+            self.record_failure()
+        else:
+            # Not a verdict on the dependency; let another trial through
+            with self._lock:
+                self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit once the limit is reached."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning(
+                        f"Circuit opened after {self._failures} consecutive failures",
+                    )
+                # A failed trial call restarts the open period
+                self._opened_at = time.monotonic()
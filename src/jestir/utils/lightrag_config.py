@@ -20,6 +20,11 @@ def load_lightrag_config() -> LightRAGAPIConfig:
         api_key=os.getenv("LIGHTRAG_API_KEY"),
         timeout=int(os.getenv("LIGHTRAG_TIMEOUT", "30")),
         mock_mode=os.getenv("LIGHTRAG_MOCK_MODE", "false").lower() == "true",
+        speculative_details=os.getenv(
+            "LIGHTRAG_SPECULATIVE_DETAILS",
+            "false",
+        ).lower()
+        == "true",
     )
 
 
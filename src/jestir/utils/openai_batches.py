@@ -0,0 +1,111 @@
+"""Batch API helpers shared by the generation services."""
+
+import json
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from openai import OpenAI
+
+# Batch API job states that will never produce output
+_BATCH_FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+
+def write_batch_jsonl(
+    requests: Iterable[tuple[str, dict[str, Any]]],
+    output_file: str | Path,
+) -> Path:
+    """
+    Write chat completion requests to a Batch API input file.
+
+    Args:
+        requests: (custom_id, request body) pairs to write
+        output_file: Path of the JSONL file to write
+
+    Returns:
+        Path of the written file
+    """
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        for custom_id, body in requests:
+            request = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }
+            f.write(json.dumps(request) + "\n")
+
+    return output_path
+
+
+def submit_batch(client: OpenAI, jsonl_file: str | Path) -> str:
+    """
+    Upload a batch request file and start a Batch API job.
+
+    Args:
+        client: Client used to upload the file and create the batch
+        jsonl_file: File written by write_batch_jsonl
+
+    Returns:
+        ID of the created batch
+    """
+    with open(jsonl_file, "rb") as f:
+        batch_input = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def collect_batch(
+    client: OpenAI,
+    batch_id: str,
+    poll_interval: float = 30.0,
+) -> dict[str, str]:
+    """
+    Wait for a Batch API job to finish and return its completion texts.
+
+    Args:
+        client: Client used to poll the batch and download its output
+        batch_id: ID returned by submit_batch
+        poll_interval: Seconds to wait between status checks
+
+    Returns:
+        Raw completion content keyed by request custom_id. Requests that
+        failed or returned no content are left out.
+
+    Raises:
+        RuntimeError: If the batch failed, expired or was cancelled
+    """
+    batch = client.batches.retrieve(batch_id)
+    while batch.status != "completed":
+        if batch.status in _BATCH_FAILED_STATUSES:
+            raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch_id)
+
+    if not batch.output_file_id:
+        return {}
+
+    contents: dict[str, str] = {}
+    output = client.files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        choices = response.get("body", {}).get("choices") or []
+        content = choices[0].get("message", {}).get("content") if choices else None
+        if content:
+            contents[result["custom_id"]] = content
+
+    return contents
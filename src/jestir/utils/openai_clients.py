@@ -0,0 +1,88 @@
+"""Process-wide OpenAI clients shared by the generation services."""
+
+import importlib.util
+import threading
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Pool sizing for shared clients; the SDK default of 10 keep-alive
+# connections is easily exhausted once several services share one pool
+_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=128,
+    max_keepalive_connections=64,
+)
+
+# Pool sizing for concurrent async generation; the SDK default of 10
+# keep-alive connections throttles large fan-outs
+_ASYNC_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=256,
+    max_keepalive_connections=128,
+)
+
+# Retries for transient failures (connection errors, 408/409/429 and 5xx);
+# the SDK backs off exponentially with jitter between attempts
+OPENAI_MAX_RETRIES = 5
+
+# HTTP/2 needs the optional h2 package (installed via httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: dict[tuple[str, str], OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key: str, base_url: str) -> OpenAI:
+    """
+    Return the process-wide OpenAI client for an endpoint and key.
+
+    Clients are created on first use and reused afterwards, so every
+    caller with the same credentials shares one connection pool.
+
+    Args:
+        api_key: API key sent with requests
+        base_url: Base URL of the OpenAI-compatible endpoint
+
+    Returns:
+        Shared OpenAI client
+    """
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=DefaultHttpxClient(
+                    limits=_CONNECTION_LIMITS,
+                    http2=_HTTP2_AVAILABLE,
+                ),
+            )
+            _clients[key] = client
+        return client
+
+
+def create_async_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """
+    Create an async OpenAI client sized for concurrent generation.
+
+    Async clients pool connections on the event loop that opened them, so
+    callers create one per loop rather than sharing one process-wide.
+
+    Args:
+        api_key: API key sent with requests
+        base_url: Base URL of the OpenAI-compatible endpoint
+
+    Returns:
+        New AsyncOpenAI client
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=DefaultAsyncHttpxClient(limits=_ASYNC_CONNECTION_LIMITS),
+    )
@@ -0,0 +1,74 @@
+"""Helpers for laying out prompts so providers can cache their prefix."""
+
+from typing import Any
+
+
+def is_anthropic_model(base_url: str, model: str) -> bool:
+    """Check whether requests are routed to an Anthropic (Claude) model."""
+    return "anthropic.com" in base_url or "claude" in model.lower()
+
+
+def build_system_message(content: str, base_url: str, model: str) -> dict[str, Any]:
+    """
+    Build the system message that opens the cacheable prompt prefix.
+
+    OpenAI caches repeated prompt prefixes automatically. Claude models only
+    cache up to an explicit cache_control breakpoint, so the system block is
+    marked as one when the request is routed to Claude.
+
+    Args:
+        content: Static system prompt text
+        base_url: Base URL requests are sent to
+        model: Model name requests are sent to
+
+    Returns:
+        Chat completion message for the system prompt
+    """
+    if is_anthropic_model(base_url, model):
+        return {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": content,
+                    "cache_control": {"type": "ephemeral"},
+                },
+            ],
+        }
+    return {"role": "system", "content": content}
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    Read how many prompt tokens the provider served from its prompt cache.
+
+    Args:
+        usage: Usage object from a chat completion response
+
+    Returns:
+        Number of cached prompt tokens, or 0 when not reported
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if isinstance(cached, int):
+        return cached
+
+    # Anthropic reports cache reads in a field of its own
+    cached = getattr(usage, "cache_read_input_tokens", None)
+    return cached if isinstance(cached, int) else 0
+
+
+def cache_write_tokens(usage: Any) -> int:
+    """
+    Read how many prompt tokens were written to the provider's prompt cache.
+
+    Only Anthropic reports cache writes; other providers return 0.
+
+    Args:
+        usage: Usage object from a chat completion response
+
+    Returns:
+        Number of prompt tokens written to the cache, or 0 when not reported
+    """
+    written = getattr(usage, "cache_creation_input_tokens", None)
+    return written if isinstance(written, int) else 0
@@ -0,0 +1,33 @@
+"""Prompt building blocks shared by the outline and story services."""
+
+from ..models.story_context import StoryContext
+
+
+def describe_entities(
+    context: StoryContext,
+) -> tuple[list[str], list[str], list[str]]:
+    """Build character, location and item description lines in one pass."""
+    character_descriptions: list[str] = []
+    location_descriptions: list[str] = []
+    item_descriptions: list[str] = []
+    buckets = {
+        "character": character_descriptions,
+        "location": location_descriptions,
+        "item": item_descriptions,
+    }
+
+    for entity in context.entities.values():
+        descriptions = buckets.get(entity.type)
+        if descriptions is None:
+            continue
+        desc = f"- {entity.name}: {entity.description}"
+        if entity.subtype:
+            desc += f" ({entity.subtype})"
+        descriptions.append(desc)
+
+    return character_descriptions, location_descriptions, item_descriptions
+
+
+def format_plot_points(plot_points: list[str]) -> str:
+    """Format plot points as a markdown list, or an empty string."""
+    return "- " + "\n- ".join(plot_points) if plot_points else ""
@@ -1,8 +1,10 @@
 """Integration tests for LightRAG API client."""
 
 import asyncio
-from unittest.mock import patch
+import json
+from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 
 from jestir.models.api_config import LightRAGAPIConfig
@@ -70,6 +72,15 @@ class TestLightRAGClient:
         assert entity.properties["age"] == 8
         assert "curious" in entity.description.lower()
 
+    def test_get_entity_details_mock_mode_returns_independent_copy(self, client):
+        """Test that mutating a mock entity does not leak into later calls."""
+        entity = asyncio.run(client.get_entity_details("lily"))
+        entity.properties["age"] = 99
+
+        again = asyncio.run(client.get_entity_details("lily"))
+
+        assert again.properties["age"] == 8
+
     def test_get_entity_details_not_found(self, client):
         """Test getting details for non-existent entity."""
         entity = asyncio.run(client.get_entity_details("nonexistent"))
@@ -110,6 +121,36 @@ class TestLightRAGClient:
             # Should find at least one result for exact matches
             assert len(results) > 0
 
+    def test_fuzzy_search_skips_failed_variations(self, client):
+        """Test that one failing variation does not discard the others."""
+        original_search = client.search_entities
+
+        async def flaky_search(query, **kwargs):
+            if query.startswith("*"):
+                raise RuntimeError("boom")
+            return await original_search(query, **kwargs)
+
+        with patch.object(client, "search_entities", side_effect=flaky_search):
+            results = asyncio.run(
+                client.fuzzy_search_entities("lily", entity_type="character"),
+            )
+
+        assert any(e.name.lower() == "lily" for e in results)
+
+    def test_fuzzy_search_deduplicates_variations(self, client):
+        """Test that identical case variations are only searched once."""
+        original_search = client.search_entities
+        queries = []
+
+        async def recording_search(query, **kwargs):
+            queries.append(query)
+            return await original_search(query, **kwargs)
+
+        with patch.object(client, "search_entities", side_effect=recording_search):
+            asyncio.run(client.fuzzy_search_entities("lily"))
+
+        assert queries == ["lily", "Lily", "*lily*", "lily*", "*lily"]
+
     def test_search_entities_real_api_fallback(self):
         """Test that search falls back to mock mode when API is unavailable."""
         # Create client with mock_mode=False but API will be unavailable
@@ -122,6 +163,197 @@ class TestLightRAGClient:
         assert isinstance(result, LightRAGSearchResult)
         assert len(result.entities) > 0
 
+    def test_search_entities_caches_repeated_queries(self):
+        """Test that identical searches are served from the cache."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+        response = {"response": "entities:\n  - name: Lily\n    type: character"}
+
+        with patch.object(client, "_post", AsyncMock(return_value=response)) as post:
+            first = asyncio.run(client.search_entities("lily"))
+            first.entities[0].confidence = 0.1
+            second = asyncio.run(client.search_entities("lily"))
+
+        assert post.await_count == 1
+        assert second.entities[0].name == "Lily"
+        assert second.entities[0].confidence is None
+
+    def test_search_entities_does_not_cache_errors(self):
+        """Test that error fallbacks are retried instead of cached."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+
+        with patch.object(
+            client,
+            "_post",
+            AsyncMock(side_effect=RuntimeError("boom")),
+        ) as post:
+            asyncio.run(client.search_entities("lily"))
+            asyncio.run(client.search_entities("lily"))
+
+        assert post.await_count == 2
+
+    def test_get_entity_details_speculative_query(self):
+        """Test that speculative details queries run alongside the exists check."""
+        config = LightRAGAPIConfig(
+            base_url="http://localhost:8000",
+            mock_mode=False,
+            speculative_details=True,
+        )
+        client = LightRAGClient(config)
+        details = {
+            "response": '{"entity": {"name": "Lily", "type": "character"}}',
+        }
+
+        with (
+            patch.object(
+                client,
+                "_get",
+                AsyncMock(return_value={"exists": True}),
+            ),
+            patch.object(client, "_post", AsyncMock(return_value=details)) as post,
+        ):
+            entity = asyncio.run(client.get_entity_details("Lily"))
+
+        assert post.await_count == 1
+        assert entity.name == "Lily"
+        assert entity.entity_type == "character"
+
+    def test_get_entity_details_speculative_query_discarded(self):
+        """Test that the speculative query is dropped for unknown entities."""
+        config = LightRAGAPIConfig(
+            base_url="http://localhost:8000",
+            mock_mode=False,
+            speculative_details=True,
+        )
+        client = LightRAGClient(config)
+
+        async def slow_post(path, payload):
+            await asyncio.sleep(10)
+
+        with (
+            patch.object(
+                client,
+                "_get",
+                AsyncMock(return_value={"exists": False}),
+            ),
+            patch.object(client, "_post", side_effect=slow_post),
+        ):
+            entity = asyncio.run(client.get_entity_details("Nobody"))
+
+        assert entity is None
+
+    def test_get_entity_details_exists_not_found(self):
+        """Test that a 404 from the exists check reports the entity as missing."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+        transport = httpx.MockTransport(
+            lambda _request: httpx.Response(404, json={"detail": "Not Found"}),
+        )
+
+        async def run():
+            http_client = httpx.AsyncClient(transport=transport)
+            with patch.object(
+                client,
+                "_get_client",
+                AsyncMock(return_value=http_client),
+            ):
+                return await client.get_entity_details("Lily")
+
+        assert asyncio.run(run()) is None
+
+    def test_get_available_entity_types_cached_until_cleared(self):
+        """Test that entity type labels are reused until the cache is cleared."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+
+        with patch.object(
+            client,
+            "_get",
+            AsyncMock(return_value=["character", "location"]),
+        ) as get:
+            asyncio.run(client.get_available_entity_types())
+            types = asyncio.run(client.get_available_entity_types())
+            client.clear_cache()
+            asyncio.run(client.get_available_entity_types())
+
+        assert types == ["character", "location"]
+        assert get.await_count == 2
+
+    def test_search_entities_stream_accumulates_chunks(self):
+        """Test that streamed NDJSON chunks are joined and parsed."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+        body = (
+            '{"response": "entities:\\n  - name: Lily\\n"}\n'
+            "not json\n"
+            '{"response": "    type: character"}\n'
+        )
+        transport = httpx.MockTransport(
+            lambda _request: httpx.Response(200, content=body.encode()),
+        )
+        received = []
+
+        async def run_stream():
+            http_client = httpx.AsyncClient(transport=transport)
+            with patch.object(
+                client,
+                "_get_client",
+                AsyncMock(return_value=http_client),
+            ):
+                return await client.search_entities_stream(
+                    "lily",
+                    on_chunk=received.append,
+                )
+
+        result = asyncio.run(run_stream())
+
+        assert len(received) == 2
+        assert [e.name for e in result.entities] == ["Lily"]
+        assert result.entities[0].entity_type == "character"
+
+    def test_post_sends_serialized_json_payload(self):
+        """Test that request payloads are pre-serialized as JSON bodies."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"response": "ok"})
+
+        async def post():
+            http_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler),
+                headers=client._get_headers(),
+            )
+            with patch.object(
+                client,
+                "_get_client",
+                AsyncMock(return_value=http_client),
+            ):
+                return await client._post("/query", {"query": "Lily's dragon"})
+
+        result = asyncio.run(post())
+
+        assert result == {"response": "ok"}
+        assert requests[0].headers["Content-Type"] == "application/json"
+        assert json.loads(requests[0].content) == {"query": "Lily's dragon"}
+
+    def test_get_available_entity_types_drops_non_string_labels(self):
+        """Test that malformed labels are skipped instead of discarding the list."""
+        config = LightRAGAPIConfig(base_url="http://localhost:8000", mock_mode=False)
+        client = LightRAGClient(config)
+
+        with patch.object(
+            client,
+            "_get",
+            AsyncMock(return_value=["character", None, "wizard", 3]),
+        ):
+            types = asyncio.run(client.get_available_entity_types())
+
+        assert types == ["character", "wizard"]
+
     def test_search_entities_with_different_modes(self, client):
         """Test search with different query modes."""
         modes = ["local", "global", "hybrid", "naive", "mix", "bypass"]
@@ -169,6 +401,39 @@ class TestLightRAGClient:
         assert client.config.timeout == expected_config.timeout
         assert client.config.mock_mode == expected_config.mock_mode
 
+    def test_pooled_client_reused_within_event_loop(self, client):
+        """Test that requests on one event loop share a single HTTP client."""
+
+        async def get_twice():
+            first = await client._get_client()
+            second = await client._get_client()
+            return first, second
+
+        first, second = asyncio.run(get_twice())
+
+        assert first is second
+        assert first.headers["X-API-Key"] == "test-key"
+
+    def test_pooled_client_recreated_for_new_event_loop(self, client):
+        """Test that a client bound to a finished event loop is not reused."""
+        first = asyncio.run(client._get_client())
+        second = asyncio.run(client._get_client())
+
+        assert first is not second
+
+    def test_async_context_manager_closes_client(self, mock_config):
+        """Test that leaving the async context closes the pooled client."""
+
+        async def use_client():
+            async with LightRAGClient(mock_config) as client:
+                http_client = await client._get_client()
+            return client, http_client
+
+        client, http_client = asyncio.run(use_client())
+
+        assert http_client.is_closed
+        assert client._client is None
+
     def test_entity_parsing(self, client):
         """Test parsing of entity data from API responses."""
         # Test the internal parsing methods
@@ -193,6 +458,43 @@ class TestLightRAGClient:
         assert result.mode == "local"
         assert len(result.entities) >= 0  # May be empty depending on parsing logic
 
+    def test_extract_entities_from_nested_json(self, client):
+        """Test that JSON entities with nested properties are extracted."""
+        text = (
+            'Here you go: {"name": "Lily", "type": "character", '
+            '"properties": {"age": 8}} and {"name": "Magic Forest", '
+            '"type": "location"}'
+        )
+
+        entities = client._extract_entities_from_text(text, "characters")
+
+        assert [e.name for e in entities] == ["Lily", "Magic Forest"]
+        assert entities[0].properties == {"age": 8}
+
+    def test_extract_entities_from_json_document(self, client):
+        """Test that a response that is entirely JSON is parsed in one pass."""
+        text = '{"entities": [{"name": "Lily", "type": "character"}]}'
+
+        entities = client._extract_entities_from_text(text, "characters")
+
+        assert len(entities) == 1
+        assert entities[0].name == "Lily"
+        assert entities[0].entity_type == "character"
+
+    def test_extract_entities_from_prose_skips_json_scan(self, client):
+        """Test that prose responses go straight to pattern extraction."""
+        with patch.object(client, "_iter_json_entity_data") as json_scan:
+            entities = client._extract_entities_from_text(
+                "Characters: Lily\nLocation: Magic Forest",
+                "characters",
+            )
+
+        json_scan.assert_not_called()
+        assert [(e.name, e.entity_type) for e in entities] == [
+            ("Lily", "character"),
+            ("Magic Forest", "location"),
+        ]
+
 
 class TestLightRAGEntity:
     """Test cases for LightRAGEntity dataclass."""
@@ -0,0 +1,79 @@
+"""Tests for the circuit breaker utility."""
+
+from unittest.mock import patch
+
+import pytest
+
+from jestir.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens once the failure limit is reached."""
+        breaker = CircuitBreaker(fail_max=2, reset_timeout=60.0)
+
+        for _ in range(2):
+            with pytest.raises(ValueError), breaker:
+                raise ValueError("boom")
+
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError), breaker:
+            pass
+
+    def test_success_resets_failure_count(self):
+        """Test that a success in between keeps the circuit closed."""
+        breaker = CircuitBreaker(fail_max=2)
+
+        with pytest.raises(ValueError), breaker:
+            raise ValueError("boom")
+        with breaker:
+            pass
+        with pytest.raises(ValueError), breaker:
+            raise ValueError("boom")
+
+        assert not breaker.is_open
+
+    def test_ignores_unlisted_exceptions(self):
+        """Test that only the configured failure types are counted."""
+        breaker = CircuitBreaker(fail_max=1, failure_types=(ConnectionError,))
+
+        with pytest.raises(ValueError), breaker:
+            raise ValueError("not an outage")
+
+        assert not breaker.is_open
+
+    def test_allows_trial_call_after_reset_timeout(self):
+        """Test that the circuit lets a trial call through once it has cooled down."""
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30.0)
+
+        with patch("jestir.utils.circuit_breaker.time.monotonic", return_value=100.0):
+            with pytest.raises(ValueError), breaker:
+                raise ValueError("boom")
+            assert breaker.is_open
+
+        with patch("jestir.utils.circuit_breaker.time.monotonic", return_value=131.0):
+            assert not breaker.is_open
+            with breaker:
+                pass
+
+        assert not breaker.is_open
+
+    def test_half_open_lets_one_trial_through(self):
+        """Test that callers are refused while the trial call is running."""
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30.0)
+
+        with patch("jestir.utils.circuit_breaker.time.monotonic", return_value=100.0):
+            with pytest.raises(ValueError), breaker:
+                raise ValueError("boom")
+
+        with patch("jestir.utils.circuit_breaker.time.monotonic", return_value=131.0):
+            with breaker:
+                assert breaker.is_open
+                with pytest.raises(CircuitOpenError), breaker:
+                    pass
+
+            with pytest.raises(ValueError), breaker:
+                raise ValueError("boom again")
+            assert breaker.is_open
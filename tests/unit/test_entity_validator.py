@@ -164,6 +164,24 @@ class TestEntityValidator:
         similarity = validator._calculate_similarity("Alice", "Wendy")
         assert similarity < 0.5
 
+    def test_validate_entity_matches_batch(self):
+        """Test that batch validation matches per-entity validation."""
+        validator = EntityValidator()
+        entities = [
+            LightRAGEntity(name="Wendy Whisk", entity_type="character"),
+            LightRAGEntity(name="Whiskers", entity_type="character"),
+            LightRAGEntity(name="Magic Forest", entity_type="location"),
+        ]
+
+        results = validator.validate_entity_matches("whiskers", entities, "character")
+
+        assert [r.entity for r in results] == entities
+        for result, entity in zip(results, entities, strict=True):
+            single = validator.validate_entity_match("whiskers", entity, "character")
+            assert result.similarity_score == single.similarity_score
+            assert result.confidence == single.confidence
+            assert result.match_reason == single.match_reason
+
     def test_filter_high_confidence_matches(self):
         """Test filtering high confidence matches."""
         validator = EntityValidator()
@@ -0,0 +1,40 @@
+"""Tests for the shared OpenAI client registry."""
+
+from jestir.models.api_config import CreativeAPIConfig
+from jestir.services.outline_generator import OutlineGenerator
+from jestir.utils.openai_clients import (
+    OPENAI_MAX_RETRIES,
+    create_async_client,
+    get_shared_client,
+)
+
+
+class TestSharedClients:
+    """Test cases for get_shared_client."""
+
+    def test_same_credentials_share_client(self):
+        """Test that one client is reused for the same key and endpoint."""
+        first = get_shared_client("key-a", "https://one.example.com/v1")
+        second = get_shared_client("key-a", "https://one.example.com/v1")
+
+        assert first is second
+
+    def test_different_credentials_get_separate_clients(self):
+        """Test that keys and endpoints never share a client."""
+        base = get_shared_client("key-a", "https://one.example.com/v1")
+
+        assert get_shared_client("key-b", "https://one.example.com/v1") is not base
+        assert get_shared_client("key-a", "https://two.example.com/v1") is not base
+
+    def test_generators_share_client(self):
+        """Test that generator instances reuse the shared client."""
+        config = CreativeAPIConfig(api_key="key-c", base_url="https://one.example.com")
+
+        assert OutlineGenerator(config).client is OutlineGenerator(config).client
+
+    def test_async_client_uses_retry_budget(self):
+        """Test that async clients retry transient failures like shared ones."""
+        client = create_async_client("key-d", "https://one.example.com/v1")
+
+        assert client.max_retries == OPENAI_MAX_RETRIES
+        assert client is not create_async_client("key-d", "https://one.example.com/v1")
@@ -1,9 +1,13 @@
 """Tests for the outline generator service."""
 
+import asyncio
+import json
 import tempfile
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
+import openai
 import pytest
 import yaml
 
@@ -13,6 +17,23 @@ from jestir.models.story_context import StoryContext
 from jestir.services.outline_generator import OutlineGenerator
 
 
+def _stream_chunks(content, usage=None):
+    """Build streamed completion chunks that deliver the given content."""
+    chunks = []
+    for piece in [content[:10], content[10:]] if content else [None]:
+        chunk = Mock()
+        chunk.usage = None
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = piece
+        chunks.append(chunk)
+
+    final = Mock()
+    final.usage = usage
+    final.choices = []
+    chunks.append(final)
+    return chunks
+
+
 class TestOutlineGenerator:
     """Test cases for OutlineGenerator."""
 
@@ -47,6 +68,21 @@ class TestOutlineGenerator:
             assert generator.config.max_tokens == 1500
             assert generator.config.temperature == 0.8
 
+    def test_max_tokens_omitted_when_unset(self):
+        """Test that outlines are uncapped unless a token limit is configured."""
+        with patch.dict(
+            "os.environ",
+            {"OPENAI_CREATIVE_API_KEY": "env-key"},
+            clear=True,
+        ):
+            generator = OutlineGenerator()
+
+        assert generator.config.max_tokens is None
+        assert "max_tokens" not in generator._completion_params("prompt")
+
+        generator.config.max_tokens = 1200
+        assert generator._completion_params("prompt")["max_tokens"] == 1200
+
     def test_generate_outline_success(self):
         """Test successful outline generation."""
         # Create a mock context
@@ -67,9 +103,7 @@ class TestOutlineGenerator:
         )
 
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = """# Story Outline: Arthur's Quest
+        content = """# Story Outline: Arthur's Quest
 
 ## Act I: Beginning
 ### Scene 1: The Call to Adventure
@@ -97,11 +131,12 @@ With courage and determination, you can achieve your goals."""
         with patch.object(
             generator.client.chat.completions,
             "create",
-            return_value=mock_response,
-        ):
+            return_value=_stream_chunks(content),
+        ) as create:
             outline = generator.generate_outline(context)
 
-            assert "# Story Outline: Arthur's Adventure" in outline
+            assert create.call_args.kwargs["stream"] is True
+            assert "# Story Outline: Arthur's Quest" in outline
             assert "Act I: Beginning" in outline
             assert "Act II: Middle" in outline
             assert "Act III: End" in outline
@@ -134,6 +169,26 @@ With courage and determination, you can achieve your goals."""
             assert "Act II: Middle" in outline
             assert "Act III: End" in outline
 
+    def test_generate_outline_skips_api_while_circuit_open(self):
+        """Test that sustained API failures short-circuit to the fallback outline."""
+        context = StoryContext()
+        context.add_plot_point("find a magical sword")
+
+        error = openai.APIConnectionError(
+            request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+        )
+        generator = OutlineGenerator()
+        generator._breaker.fail_max = 2
+        with patch.object(
+            generator.client.chat.completions,
+            "create",
+            side_effect=error,
+        ) as create:
+            outlines = [generator.generate_outline(context) for _ in range(4)]
+
+        assert create.call_count == 2
+        assert all("The Hero's Adventure" in outline for outline in outlines)
+
     def test_generate_outline_empty_response(self):
         """Test outline generation with empty OpenAI response."""
         context = StoryContext()
@@ -147,21 +202,276 @@ With courage and determination, you can achieve your goals."""
             ),
         )
 
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = None
-
         generator = OutlineGenerator()
         with patch.object(
             generator.client.chat.completions,
             "create",
-            return_value=mock_response,
+            return_value=_stream_chunks(None),
         ):
             outline = generator.generate_outline(context)
 
             assert "# Story Outline: Arthur's Adventure" in outline
             assert "Act I: Beginning" in outline
 
+    def test_stream_outline_yields_fragments_and_tracks_usage(self):
+        """Test that streamed fragments are yielded and usage is tracked once."""
+        context = StoryContext()
+        context.add_plot_point("find a magical sword")
+
+        usage = Mock(prompt_tokens=120, completion_tokens=30)
+        generator = OutlineGenerator()
+        with (
+            patch.object(
+                generator.client.chat.completions,
+                "create",
+                return_value=_stream_chunks("# Story Outline: Streamed", usage),
+            ) as create,
+            patch.object(generator.token_tracker, "track_usage") as track_usage,
+        ):
+            fragments = list(generator.stream_outline(context))
+
+        assert fragments == ["# Story Ou", "tline: Streamed"]
+        assert create.call_args.kwargs["stream_options"] == {"include_usage": True}
+        track_usage.assert_called_once()
+        assert track_usage.call_args.kwargs["prompt_tokens"] == 120
+        assert track_usage.call_args.kwargs["output_text"] == (
+            "# Story Outline: Streamed"
+        )
+        # The prompt itself is recorded, not a serialized dump of the context
+        assert track_usage.call_args.kwargs["input_text"] == (
+            generator._build_outline_prompt(context)
+        )
+
+    def test_agenerate_outlines_concurrent(self):
+        """Test that async generation returns one outline per context, in order."""
+        contexts = []
+        for name in ["Arthur", "Lily", "Max"]:
+            context = StoryContext()
+            context.add_entity(
+                Entity(
+                    id="char_001",
+                    type="character",
+                    subtype="protagonist",
+                    name=name,
+                    description="A brave hero",
+                ),
+            )
+            contexts.append(context)
+
+        def make_response(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            name = next(n for n in ["Arthur", "Lily", "Max"] if n in prompt)
+            response = Mock()
+            response.usage = None
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"# Story Outline: {name}"
+            return response
+
+        generator = OutlineGenerator()
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=make_response)
+
+        with patch.object(generator, "_get_async_client", return_value=mock_client):
+            outlines = asyncio.run(
+                generator.agenerate_outlines(contexts, max_concurrency=2),
+            )
+
+        assert mock_client.chat.completions.create.await_count == 3
+        assert [outline.splitlines()[0] for outline in outlines] == [
+            "# Story Outline: Arthur",
+            "# Story Outline: Lily",
+            "# Story Outline: Max",
+        ]
+
+    def test_agenerate_outline_fallback(self):
+        """Test async fallback outline generation when OpenAI fails."""
+        context = StoryContext()
+        context.add_plot_point("find a magical sword")
+
+        generator = OutlineGenerator()
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=Exception("API Error"),
+        )
+
+        with patch.object(generator, "_get_async_client", return_value=mock_client):
+            outline = asyncio.run(generator.agenerate_outline(context))
+
+        assert "# Story Outline: The Hero's Adventure" in outline
+
+    def test_generate_outline_caches_identical_requests(self):
+        """Test that an identical prompt is served from the response cache."""
+        context = StoryContext()
+        context.add_plot_point("find a magical sword")
+
+        generator = OutlineGenerator()
+        with patch.object(
+            generator.client.chat.completions,
+            "create",
+            return_value=_stream_chunks("# Story Outline: Cached"),
+        ) as create:
+            first = generator.generate_outline(context)
+            second = generator.generate_outline(context)
+            generator.clear_cache()
+            generator.generate_outline(context)
+
+        assert first == second
+        assert first.startswith("# Story Outline: Cached")
+        assert create.call_count == 2
+
+    def test_generate_outlines_batched_single_request(self):
+        """Test that a batch of contexts is served by one split response."""
+        contexts = []
+        for name in ["Arthur", "Lily", "Max"]:
+            context = StoryContext()
+            context.add_plot_point(f"{name} finds a magical sword")
+            contexts.append(context)
+
+        mock_response = Mock()
+        mock_response.usage = None
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = (
+            "# Story Outline: Arthur\n<<<OUTLINE_BREAK>>>\n"
+            "# Story Outline: Lily\n<<<OUTLINE_BREAK>>>\n"
+            "# Story Outline: Max\n"
+        )
+
+        generator = OutlineGenerator(
+            CreativeAPIConfig(api_key="test-key", max_tokens=1000),
+        )
+        with patch.object(
+            generator.client.chat.completions,
+            "create",
+            return_value=mock_response,
+        ) as create:
+            outlines = generator.generate_outlines_batched(contexts, batch_size=3)
+
+        assert create.call_count == 1
+        assert create.call_args.kwargs["max_tokens"] == 3000
+        assert [outline.splitlines()[0] for outline in outlines] == [
+            "# Story Outline: Arthur",
+            "# Story Outline: Lily",
+            "# Story Outline: Max",
+        ]
+
+    def test_build_batch_prompt_strips_per_request_instruction(self):
+        """Test that the closing instruction appears once, not once per request."""
+        contexts = [StoryContext(), StoryContext()]
+        contexts[0].add_plot_point("find a magical sword")
+        contexts[1].add_plot_point("rescue a lost kitten")
+
+        generator = OutlineGenerator()
+        with patch.object(
+            generator,
+            "_build_outline_prompt",
+            return_value="Outline request body\n\nGenerate the outline now:\n",
+        ):
+            prompt = generator._build_batch_prompt(contexts)
+
+        assert prompt.count("Generate the outline now:") <= 1
+        assert prompt.count("Outline request body") == 2
+
+    def test_generate_outlines_batched_count_mismatch(self):
+        """Test that a response with the wrong outline count is retried per context."""
+        contexts = [StoryContext(), StoryContext()]
+        contexts[0].add_plot_point("find a magical sword")
+        contexts[1].add_plot_point("rescue a lost kitten")
+
+        batched = Mock()
+        batched.usage = None
+        batched.choices = [Mock()]
+        batched.choices[0].message.content = "# Story Outline: Only One"
+
+        single = _stream_chunks("# Story Outline: Single")
+
+        generator = OutlineGenerator()
+        with patch.object(
+            generator.client.chat.completions,
+            "create",
+            side_effect=[batched, single, single],
+        ) as create:
+            outlines = generator.generate_outlines_batched(contexts)
+
+        assert create.call_count == 3
+        assert len(outlines) == 2
+        assert all(
+            outline.startswith("# Story Outline: Single") for outline in outlines
+        )
+
+    def test_build_batch_jsonl(self):
+        """Test that batch requests are written one per context."""
+        contexts = [StoryContext(), StoryContext()]
+        contexts[0].add_plot_point("find a magical sword")
+        contexts[1].add_plot_point("rescue a lost kitten")
+
+        generator = OutlineGenerator()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = generator.build_batch_jsonl(
+                contexts,
+                str(Path(temp_dir) / "batch.jsonl"),
+            )
+            lines = path.read_text(encoding="utf-8").splitlines()
+
+        requests = [json.loads(line) for line in lines]
+        assert [request["custom_id"] for request in requests] == [
+            "outline-0",
+            "outline-1",
+        ]
+        assert requests[0]["url"] == "/v1/chat/completions"
+        assert requests[0]["body"]["model"] == generator.config.model
+        assert "rescue a lost kitten" in requests[1]["body"]["messages"][-1]["content"]
+
+    def test_collect_batch(self):
+        """Test that completed batch output is parsed by custom_id."""
+        output = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "custom_id": "outline-0",
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [
+                                    {"message": {"content": "# Story Outline: One"}},
+                                ],
+                            },
+                        },
+                    },
+                ),
+                json.dumps(
+                    {
+                        "custom_id": "outline-1",
+                        "response": {"status_code": 500, "body": {}},
+                    },
+                ),
+            ],
+        )
+
+        generator = OutlineGenerator()
+        mock_client = Mock()
+        mock_client.batches.retrieve.side_effect = [
+            Mock(status="in_progress"),
+            Mock(status="completed", output_file_id="file-out"),
+        ]
+        mock_client.files.content.return_value = Mock(text=output)
+        generator.client = mock_client
+
+        with patch("jestir.utils.openai_batches.time.sleep"):
+            outlines = generator.collect_batch("batch-1", poll_interval=0)
+
+        assert outlines == {"outline-0": "# Story Outline: One"}
+        mock_client.files.content.assert_called_once_with("file-out")
+
+    def test_collect_batch_failed(self):
+        """Test that a failed batch raises an error."""
+        generator = OutlineGenerator()
+        mock_client = Mock()
+        mock_client.batches.retrieve.return_value = Mock(status="failed")
+        generator.client = mock_client
+
+        with pytest.raises(RuntimeError, match="failed"):
+            generator.collect_batch("batch-1")
+
     def test_build_outline_prompt(self):
         """Test outline prompt building."""
         context = StoryContext()
@@ -201,8 +511,29 @@ With courage and determination, you can achieve your goals."""
         assert "Arthur" in prompt
         assert "Enchanted Forest" in prompt
         assert "find a magical sword" in prompt
-        assert "3-act structure" in prompt
-        assert "markdown formatting" in prompt
+
+        # Static instructions live in the system prompt, ahead of the request
+        params = generator._completion_params(prompt)
+        system_message, user_message = params["messages"]
+        assert "3-act structure" in system_message["content"]
+        assert "markdown formatting" in system_message["content"]
+        assert "3-act structure" not in user_message["content"]
+
+    def test_completion_params_marks_cache_breakpoint_for_claude(self):
+        """Test Claude requests mark the static system prompt as cacheable."""
+        config = CreativeAPIConfig(
+            api_key="test-key",
+            base_url="https://api.anthropic.com/v1/",
+            model="claude-sonnet-4-5",
+        )
+        generator = OutlineGenerator(config=config)
+
+        system_message = generator._completion_params("prompt")["messages"][0]
+        assert system_message is generator._completion_params("other")["messages"][0]
+
+        block = system_message["content"][0]
+        assert block["text"] == generator._system_prompt
+        assert block["cache_control"] == {"type": "ephemeral"}
 
     def test_format_outline(self):
         """Test outline formatting."""
@@ -218,6 +549,11 @@ With courage and determination, you can achieve your goals."""
         formatted = generator._format_outline(content)
         assert formatted.startswith("# Story Outline")
 
+        # Test that each line is stripped and blank lines are kept
+        content = "# Title  \n\n   - indented\t\r\n  \t\n## Next "
+        formatted = generator._format_outline(content)
+        assert formatted == "# Title\n\n- indented\n\n## Next"
+
     def test_fallback_outline(self):
         """Test fallback outline generation."""
         context = StoryContext()
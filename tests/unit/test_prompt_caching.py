@@ -0,0 +1,66 @@
+"""Tests for the prompt caching helpers."""
+
+from types import SimpleNamespace
+
+from jestir.utils.prompt_caching import (
+    build_system_message,
+    cache_write_tokens,
+    cached_prompt_tokens,
+)
+
+
+class TestPromptCaching:
+    """Test cases for prompt caching helpers."""
+
+    def test_system_message_plain_for_openai(self):
+        """Test that OpenAI requests get a plain system message."""
+        message = build_system_message(
+            "Static rules",
+            "https://api.openai.com/v1",
+            "gpt-4o",
+        )
+
+        assert message == {"role": "system", "content": "Static rules"}
+
+    def test_system_message_marks_breakpoint_for_claude(self):
+        """Test that Claude requests mark the system prompt as cacheable."""
+        message = build_system_message(
+            "Static rules",
+            "https://api.anthropic.com/v1/",
+            "claude-sonnet-4-5",
+        )
+
+        assert message["content"] == [
+            {
+                "type": "text",
+                "text": "Static rules",
+                "cache_control": {"type": "ephemeral"},
+            },
+        ]
+
+    def test_cached_tokens_from_openai_usage(self):
+        """Test reading cached tokens from OpenAI usage details."""
+        usage = SimpleNamespace(
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1152),
+        )
+
+        assert cached_prompt_tokens(usage) == 1152
+        assert cache_write_tokens(usage) == 0
+
+    def test_cache_tokens_from_anthropic_usage(self):
+        """Test reading cache reads and writes from Anthropic usage fields."""
+        usage = SimpleNamespace(
+            prompt_tokens_details=None,
+            cache_read_input_tokens=900,
+            cache_creation_input_tokens=300,
+        )
+
+        assert cached_prompt_tokens(usage) == 900
+        assert cache_write_tokens(usage) == 300
+
+    def test_cache_tokens_missing(self):
+        """Test that providers without cache reporting count as zero."""
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+
+        assert cached_prompt_tokens(usage) == 0
+        assert cache_write_tokens(usage) == 0
@@ -0,0 +1,42 @@
+"""Tests for the shared story prompt helpers."""
+
+from jestir.models.entity import Entity
+from jestir.models.story_context import StoryContext
+from jestir.utils.story_prompts import describe_entities, format_plot_points
+
+
+class TestStoryPrompts:
+    """Test cases for story prompt helpers."""
+
+    def test_describe_entities_single_pass(self):
+        """Test that entities are bucketed by type, keeping their order."""
+        context = StoryContext()
+        for entity_id, entity_type, name, subtype in [
+            ("char_001", "character", "Arthur", "protagonist"),
+            ("loc_001", "location", "Castle", ""),
+            ("char_002", "character", "Merlin", ""),
+            ("item_001", "item", "Sword", "magical"),
+        ]:
+            context.add_entity(
+                Entity(
+                    id=entity_id,
+                    type=entity_type,
+                    subtype=subtype,
+                    name=name,
+                    description=f"{name} description",
+                ),
+            )
+
+        characters, locations, items = describe_entities(context)
+
+        assert characters == [
+            "- Arthur: Arthur description (protagonist)",
+            "- Merlin: Merlin description",
+        ]
+        assert locations == ["- Castle: Castle description"]
+        assert items == ["- Sword: Sword description (magical)"]
+
+    def test_format_plot_points(self):
+        """Test that plot points render as a markdown list."""
+        assert format_plot_points(["a", "b"]) == "- a\n- b"
+        assert format_plot_points([]) == ""
@@ -1,6 +1,10 @@
 """Unit tests for the StoryWriter service."""
 
-from unittest.mock import Mock, mock_open, patch
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 import yaml
@@ -9,6 +13,24 @@ from jestir.models.api_config import CreativeAPIConfig
 from jestir.models.entity import Entity
 from jestir.models.story_context import StoryContext
 from jestir.services.story_writer import StoryWriter
+from jestir.utils.story_prompts import describe_entities
+
+
+def _stream_chunks(content, usage=None):
+    """Build streamed completion chunks that deliver the given content."""
+    chunks = []
+    for piece in [content[:10], content[10:]] if content else [None]:
+        chunk = Mock()
+        chunk.usage = None
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = piece
+        chunks.append(chunk)
+
+    final = Mock()
+    final.usage = usage
+    final.choices = []
+    chunks.append(final)
+    return chunks
 
 
 class TestStoryWriter:
@@ -95,33 +117,88 @@ Even when things seem difficult, with courage and determination, you can overcom
             assert writer.config.max_tokens == 5000
             assert writer.config.temperature == 0.9
 
-    @patch("jestir.services.story_writer.OpenAI")
-    def test_generate_story_success(self, mock_openai_class):
-        """Test successful story generation."""
-        # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[
-            0
-        ].message.content = "# Whiskers's Adventure\n\nOnce upon a time..."
+    def test_max_tokens_omitted_when_unset(self):
+        """Test that requests leave max_tokens to the API default when unset."""
+        writer = StoryWriter(self.config)
+        writer.config.max_tokens = None
+        assert "max_tokens" not in writer._completion_params("prompt")
+
+        writer.config.max_tokens = 1200
+        assert writer._completion_params("prompt")["max_tokens"] == 1200
 
+    @patch("jestir.services.story_writer.get_shared_client")
+    def test_generate_story_success(self, mock_get_shared_client):
+        """Test successful story generation."""
+        # Mock streamed OpenAI response
         mock_client = Mock()
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_openai_class.return_value = mock_client
+        mock_client.chat.completions.create.return_value = _stream_chunks(
+            "# Whiskers's Adventure\n\nOnce upon a time...",
+        )
+        mock_get_shared_client.return_value = mock_client
 
         writer = StoryWriter(self.config)
         result = writer.generate_story(self.test_context, self.test_outline)
 
-        assert result.startswith("# Whiskers's Adventure")
+        assert result == "# Whiskers's Adventure\n\nOnce upon a time..."
         mock_client.chat.completions.create.assert_called_once()
+        assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    @patch("jestir.services.story_writer.get_shared_client")
+    def test_stream_story_tracks_usage(self, mock_get_shared_client):
+        """Test that streamed fragments are yielded and usage is tracked once."""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = _stream_chunks(
+            "# Whiskers's Adventure",
+            Mock(prompt_tokens=200, completion_tokens=50),
+        )
+        mock_get_shared_client.return_value = mock_client
+
+        writer = StoryWriter(self.config)
+        with patch.object(writer.token_tracker, "track_usage") as track_usage:
+            fragments = list(writer.stream_story(self.test_context, self.test_outline))
+
+        assert "".join(fragments) == "# Whiskers's Adventure"
+        track_usage.assert_called_once()
+        assert track_usage.call_args.kwargs["completion_tokens"] == 50
+        assert track_usage.call_args.kwargs["cached_tokens"] == 0
+        # The prompt itself is recorded, not a serialized dump of the context
+        assert track_usage.call_args.kwargs["input_text"] == (
+            writer._build_story_prompt(self.test_context, self.test_outline)
+        )
+
+    @patch("jestir.services.story_writer.get_shared_client")
+    def test_generate_story_leads_with_static_instructions(
+        self,
+        mock_get_shared_client,
+    ):
+        """Test that static rules open the request and cached tokens are recorded."""
+        usage = Mock(prompt_tokens=1500, completion_tokens=600)
+        usage.prompt_tokens_details.cached_tokens = 1024
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = _stream_chunks(
+            "# Whiskers's Adventure\n\nOnce upon a time...",
+            usage,
+        )
+        mock_get_shared_client.return_value = mock_client
+
+        writer = StoryWriter(self.config)
+        writer.generate_story(self.test_context, self.test_outline)
 
-    @patch("jestir.services.story_writer.OpenAI")
-    def test_generate_story_fallback(self, mock_openai_class):
+        system_message, user_message = (
+            mock_client.chat.completions.create.call_args.kwargs["messages"]
+        )
+        assert "Requirements for the story" in system_message["content"]
+        assert "Requirements for the story" not in user_message["content"]
+        assert self.test_outline in user_message["content"]
+        assert writer.token_tracker.usage_history[-1].cached_tokens == 1024
+
+    @patch("jestir.services.story_writer.get_shared_client")
+    def test_generate_story_fallback(self, mock_get_shared_client):
         """Test fallback story generation when OpenAI fails."""
         # Mock OpenAI to raise exception
         mock_client = Mock()
         mock_client.chat.completions.create.side_effect = Exception("API Error")
-        mock_openai_class.return_value = mock_client
+        mock_get_shared_client.return_value = mock_client
 
         writer = StoryWriter(self.config)
         result = writer.generate_story(self.test_context, self.test_outline)
@@ -130,6 +207,178 @@ Even when things seem difficult, with courage and determination, you can overcom
         assert "Once upon a time" in result
         assert "The End" in result
 
+    @patch("jestir.services.story_writer.get_shared_client")
+    def test_generate_story_marks_cache_breakpoint_for_claude(
+        self,
+        mock_get_shared_client,
+    ):
+        """Test that Claude requests cache the static system prompt."""
+        usage = Mock(
+            prompt_tokens=1500,
+            completion_tokens=600,
+            prompt_tokens_details=None,
+            cache_read_input_tokens=0,
+            cache_creation_input_tokens=1200,
+        )
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = _stream_chunks(
+            "# Whiskers's Adventure\n\nOnce upon a time...",
+            usage,
+        )
+        mock_get_shared_client.return_value = mock_client
+
+        config = self.config.model_copy(
+            update={
+                "base_url": "https://api.anthropic.com/v1/",
+                "model": "claude-sonnet-4-5",
+            },
+        )
+        writer = StoryWriter(config)
+        writer.generate_story(self.test_context, self.test_outline)
+
+        messages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        block = messages[0]["content"][0]
+        assert block["cache_control"] == {"type": "ephemeral"}
+        assert "Requirements for the story" in block["text"]
+        assert writer.token_tracker.usage_history[-1].cache_write_tokens == 1200
+
+    def test_agenerate_stories_concurrent(self):
+        """Test that async generation returns one story per job, in order."""
+        names = ["Whiskers", "Pip", "Hazel"]
+        jobs = []
+        for name in names:
+            context = self.test_context.model_copy(deep=True)
+            context.plot_points = [f"{name} saves the forest"]
+            jobs.append((context, f"# Story Outline: {name}"))
+
+        def make_response(**kwargs):
+            prompt = kwargs["messages"][-1]["content"]
+            name = next(n for n in names if f"Story Outline: {n}" in prompt)
+            response = Mock()
+            response.usage = None
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"# {name}'s Story"
+            return response
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=make_response)
+
+        with patch.object(self.writer, "_get_async_client", return_value=mock_client):
+            stories = asyncio.run(
+                self.writer.agenerate_stories(jobs, max_concurrency=2),
+            )
+
+        assert mock_client.chat.completions.create.await_count == 3
+        assert stories == ["# Whiskers's Story", "# Pip's Story", "# Hazel's Story"]
+
+    def test_agenerate_story_fallback(self):
+        """Test async fallback story generation when OpenAI fails."""
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=Exception("API Error"),
+        )
+
+        with patch.object(self.writer, "_get_async_client", return_value=mock_client):
+            story = asyncio.run(
+                self.writer.agenerate_story(self.test_context, self.test_outline),
+            )
+
+        assert "Whiskers's Adventure" in story
+        assert "The End" in story
+
+    def test_build_batch_jsonl(self):
+        """Test that batch requests are written one per story job."""
+        other_outline = "# Story Outline: Pip's Journey"
+        jobs = [
+            (self.test_context, self.test_outline),
+            (self.test_context, other_outline),
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.writer.build_batch_jsonl(
+                jobs,
+                str(Path(temp_dir) / "batch.jsonl"),
+            )
+            lines = path.read_text(encoding="utf-8").splitlines()
+
+        requests = [json.loads(line) for line in lines]
+        assert [request["custom_id"] for request in requests] == [
+            "story-0",
+            "story-1",
+        ]
+        assert requests[0]["url"] == "/v1/chat/completions"
+        assert requests[0]["body"]["model"] == self.writer.config.model
+        assert other_outline in requests[1]["body"]["messages"][-1]["content"]
+
+    def test_submit_batch(self):
+        """Test that the request file is uploaded and a batch job started."""
+        mock_client = Mock()
+        mock_client.files.create.return_value = Mock(id="file-in")
+        mock_client.batches.create.return_value = Mock(id="batch-1")
+        self.writer.client = mock_client
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "batch.jsonl"
+            path.write_text("{}\n", encoding="utf-8")
+            batch_id = self.writer.submit_batch(path)
+
+        assert batch_id == "batch-1"
+        assert mock_client.files.create.call_args.kwargs["purpose"] == "batch"
+        mock_client.batches.create.assert_called_once_with(
+            input_file_id="file-in",
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+    def test_collect_batch(self):
+        """Test that completed batch output is parsed by custom_id."""
+        output = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "custom_id": "story-0",
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [
+                                    {"message": {"content": "# Whiskers's Story"}},
+                                ],
+                            },
+                        },
+                    },
+                ),
+                json.dumps(
+                    {
+                        "custom_id": "story-1",
+                        "response": {"status_code": 500, "body": {}},
+                    },
+                ),
+            ],
+        )
+
+        mock_client = Mock()
+        mock_client.batches.retrieve.side_effect = [
+            Mock(status="in_progress"),
+            Mock(status="completed", output_file_id="file-out"),
+        ]
+        mock_client.files.content.return_value = Mock(text=output)
+        self.writer.client = mock_client
+
+        with patch("jestir.utils.openai_batches.time.sleep"):
+            stories = self.writer.collect_batch("batch-1", poll_interval=0)
+
+        assert stories == {"story-0": "# Whiskers's Story"}
+        mock_client.files.content.assert_called_once_with("file-out")
+
+    def test_collect_batch_failed(self):
+        """Test that a failed batch raises instead of polling forever."""
+        mock_client = Mock()
+        mock_client.batches.retrieve.return_value = Mock(status="expired")
+        self.writer.client = mock_client
+
+        with pytest.raises(RuntimeError, match="expired"):
+            self.writer.collect_batch("batch-1", poll_interval=0)
+
     def test_build_story_prompt(self):
         """Test story prompt building."""
         prompt = self.writer._build_story_prompt(self.test_context, self.test_outline)
@@ -142,6 +391,46 @@ Even when things seem difficult, with courage and determination, you can overcom
         assert "saves the forest" in prompt
         assert self.test_outline in prompt
 
+    def test_context_blocks_memoized(self):
+        """Test that prompt blocks are reused until the context changes."""
+        with patch(
+            "jestir.services.story_writer.describe_entities",
+            wraps=describe_entities,
+        ) as describe:
+            first = self.writer._build_story_prompt(self.test_context, "Outline A")
+            second = self.writer._build_story_prompt(self.test_context, "Outline B")
+            assert describe.call_count == 1
+            assert "Outline B" in second
+            assert "Outline A" in first
+
+            self.test_context.entities["char_001"].description = "A sleepy cat"
+            third = self.writer._build_story_prompt(self.test_context, "Outline B")
+
+        assert describe.call_count == 2
+        assert "A sleepy cat" in third
+
+    def test_fallback_prompt_reuses_context_blocks(self):
+        """Test that a template failure does not rebuild the entity sections."""
+        with (
+            patch.object(
+                self.writer.template_loader,
+                "render_template",
+                side_effect=FileNotFoundError("missing template"),
+            ),
+            patch(
+                "jestir.services.story_writer.describe_entities",
+                wraps=describe_entities,
+            ) as describe,
+        ):
+            prompt = self.writer._build_story_prompt(
+                self.test_context,
+                self.test_outline,
+            )
+
+        describe.assert_called_once()
+        assert "- Whiskers: A brave little mouse (protagonist)" in prompt
+        assert self.test_outline in prompt
+
     def test_get_target_word_count(self):
         """Test target word count calculation."""
         assert self.writer._get_target_word_count("very_short") == 200
@@ -161,6 +450,11 @@ Even when things seem difficult, with courage and determination, you can overcom
         assert "The end." in formatted
         assert "  " not in formatted  # No leading/trailing spaces
 
+        # Runs of blank lines collapse to a single paragraph break
+        raw_content = "# Title\n\n  \n\t\nFirst  \n\n\n\n  Second"
+        formatted = self.writer._format_story(raw_content)
+        assert formatted == "# Title\n\nFirst\n\nSecond"
+
     def test_fallback_story(self):
         """Test fallback story generation."""
         result = self.writer._fallback_story(self.test_context, self.test_outline)
@@ -174,10 +468,12 @@ Even when things seem difficult, with courage and determination, you can overcom
         """Test loading outline from file."""
         test_content = "# Test Outline\n\nSome content here."
 
-        with patch("builtins.open", mock_open(read_data=test_content)):
-            with patch("pathlib.Path.exists", return_value=True):
-                result = self.writer.load_outline_from_file("test_outline.md")
-                assert result == test_content
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outline_file = Path(temp_dir) / "test_outline.md"
+            outline_file.write_text(test_content, encoding="utf-8")
+            result = self.writer.load_outline_from_file(str(outline_file))
+
+        assert result == test_content
 
     def test_load_outline_from_file_not_found(self):
         """Test loading outline from non-existent file."""
@@ -195,27 +491,28 @@ Even when things seem difficult, with courage and determination, you can overcom
             "plot_points": [],
         }
 
-        with patch("builtins.open", mock_open(read_data=yaml.dump(test_data))):
-            with patch("pathlib.Path.exists", return_value=True):
-                result = self.writer.load_context_from_file("test_context.yaml")
-                assert isinstance(result, StoryContext)
-                assert result.settings["genre"] == "adventure"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            context_file = Path(temp_dir) / "test_context.yaml"
+            context_file.write_text(yaml.dump(test_data), encoding="utf-8")
+            result = self.writer.load_context_from_file(str(context_file))
+
+        assert isinstance(result, StoryContext)
+        assert result.settings["genre"] == "adventure"
+
+    def test_load_context_from_file_not_found(self):
+        """Test loading context from non-existent file."""
+        with pytest.raises(FileNotFoundError):
+            self.writer.load_context_from_file("nonexistent.yaml")
 
     def test_save_story_to_file(self):
         """Test saving story to file."""
         test_story = "# Test Story\n\nContent here."
 
-        with patch("builtins.open", mock_open()) as mock_file:
-            with patch("pathlib.Path.parent") as mock_parent:
-                mock_parent.mkdir = Mock()
-                self.writer.save_story_to_file(test_story, "test_story.md")
-                # Check that open was called with a Path object and the correct arguments
-                mock_file.assert_called_once()
-                call_args = mock_file.call_args
-                assert str(call_args[0][0]).endswith("test_story.md")
-                assert call_args[0][1] == "w"
-                assert call_args[1]["encoding"] == "utf-8"
-                mock_file().write.assert_called_once_with(test_story)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / "stories" / "test_story.md"
+            self.writer.save_story_to_file(test_story, str(output_file))
+
+            assert output_file.read_text(encoding="utf-8") == test_story
 
     def test_update_context_with_story(self):
         """Test updating context with story."""
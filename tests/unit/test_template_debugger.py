@@ -0,0 +1,227 @@
+"""Unit tests for the TemplateDebugger service."""
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from jestir.services.template_debugger import (
+    PerformanceMetrics,
+    TemplateAnalysis,
+    TemplateDebugger,
+)
+from jestir.services.template_loader import TemplateLoader
+
+
+class TestTemplateDebugger:
+    """Test template analysis and debugging."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_loader = TemplateLoader(templates_dir=self.temp_dir)
+        self.debugger = TemplateDebugger(self.template_loader)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_analyze_variables_counts_usage(self):
+        """Test that each placeholder records how often it appears."""
+        variables = self.debugger._analyze_variables(
+            "{{name}} met {{friend # sidekick}}. {{name}} smiled.",
+        )
+
+        assert [var["name"] for var in variables] == ["name", "friend", "name"]
+        assert [var["usage_count"] for var in variables] == [2, 1, 2]
+        assert variables[1]["documentation"] == "sidekick"
+
+    def test_debug_rendering_reuses_analysis(self):
+        """Test that rendering coverage comes from the cached analysis."""
+        template_path = os.path.join(self.temp_dir, "story.txt")
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name}} went to {{place}} with {{friend}}.")
+
+        analysis = self.debugger.analyze_template(template_path)
+        assert [var["name"] for var in analysis.variables] == [
+            "name",
+            "place",
+            "friend",
+        ]
+
+        with patch.object(
+            self.debugger,
+            "_analyze_variables",
+            wraps=self.debugger._analyze_variables,
+        ) as analyze_variables:
+            result = self.debugger.debug_template_rendering(
+                template_path,
+                {"name": "Pip", "place": "the meadow"},
+            )
+
+        analyze_variables.assert_not_called()
+        assert result["success"] is True
+        assert result["variables_used"] == 2
+        assert result["variables_total"] == 3
+
+    def test_debug_rendering_bypasses_render_cache(self):
+        """Test that debug timings always measure a real render."""
+        template_path = os.path.join(self.temp_dir, "story.txt")
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name}} went home.")
+
+        with patch.object(
+            self.template_loader,
+            "_substitute_variables",
+            wraps=self.template_loader._substitute_variables,
+        ) as substitute:
+            for _ in range(2):
+                self.debugger.debug_template_rendering(template_path, {"name": "Pip"})
+
+        assert substitute.call_count == 2
+        assert len(self.template_loader._render_cache) == 0
+
+    def test_analysis_cache_invalidated_by_mtime(self):
+        """Test that a cached analysis is reused until the file changes."""
+        template_path = os.path.join(self.temp_dir, "story.txt")
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name}} went home.")
+
+        first = self.debugger.analyze_template(template_path)
+        assert self.debugger.analyze_template(template_path) is first
+
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name}} went to {{place}}.")
+        stat = Path(template_path).stat()
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = self.debugger.analyze_template(template_path)
+        assert second is not first
+        assert second.variable_count == 2
+
+    def test_first_analysis_keeps_loader_caches(self):
+        """Test that analyzing an unchanged template keeps the loader's renders."""
+        template_path = os.path.join(self.temp_dir, "story.txt")
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name}} went home.")
+
+        self.template_loader.render_template(template_path, {"name": "Pip"})
+        self.debugger.analyze_template(template_path)
+
+        assert len(self.template_loader._render_cache) == 1
+
+    def test_naming_issues_per_variable(self):
+        """Test naming checks, including for repeated placeholders."""
+        variables = self.debugger._analyze_variables(
+            "{{_bad name}} {{good_name}} {{_bad name}} {{$cost}}",
+        )
+
+        assert variables[0]["naming_issues"] == [
+            "contains spaces",
+            "starts/ends with underscore",
+            "contains special characters",
+        ]
+        assert variables[1]["naming_issues"] == []
+        assert variables[2]["naming_issues"] == variables[0]["naming_issues"]
+        assert variables[2]["naming_issues"] is not variables[0]["naming_issues"]
+        assert variables[3]["naming_issues"] == ["contains special characters"]
+
+    def test_duplicate_variable_names_reported_in_order(self):
+        """Test that repeated names are reported once, in first-use order."""
+        template = "{{b}} {{a}} {{c}} {{a}} {{b}} {{b}}"
+        variables = self.debugger._analyze_variables(template)
+
+        issues = self.debugger._identify_potential_issues(template, variables)
+
+        assert "Duplicate variable names: b, a" in issues
+
+    def test_find_common_issues_most_frequent_first(self):
+        """Test that shared issues are ordered by how many templates have them."""
+        analyses = [
+            TemplateAnalysis(
+                "a.txt",
+                0.0,
+                0,
+                0.0,
+                ["x", "y"],
+                [],
+                PerformanceMetrics(),
+            ),
+            TemplateAnalysis(
+                "b.txt",
+                0.0,
+                0,
+                0.0,
+                ["y", "z"],
+                [],
+                PerformanceMetrics(),
+            ),
+            TemplateAnalysis(
+                "c.txt",
+                0.0,
+                0,
+                0.0,
+                ["x", "y", "w"],
+                [],
+                PerformanceMetrics(),
+            ),
+        ]
+
+        assert self.debugger._find_common_issues(analyses) == ["y", "x"]
+
+    def test_performance_metrics(self):
+        """Test the size and variable metrics reported for a template."""
+        template_path = os.path.join(self.temp_dir, "story.txt")
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("{{name # hero}} met {{friend}}.\n{{name}} waved.")
+
+        metrics = self.debugger.analyze_template(template_path).performance_metrics
+
+        assert metrics == PerformanceMetrics(
+            template_size_bytes=47,
+            template_size_chars=47,
+            line_count=2,
+            variable_count=3,
+            average_variable_length=14 / 3,
+            max_variable_length=6,
+            documentation_coverage=1 / 3,
+            repeated_variables=0,
+            estimated_rendering_time_ms=47 * 0.001 + 3 * 0.1,
+        )
+
+    def test_complexity_score_caps_at_100(self):
+        """Test that heavily repeated undocumented variables saturate the score."""
+        template = "{{name}} and {{place}}. " * 200
+        variables = self.debugger._analyze_variables(template)
+
+        score = self.debugger._calculate_complexity_score(
+            template,
+            variables,
+            len(template.splitlines()),
+        )
+
+        assert score == 100.0
+
+    def test_variable_documentation_parsing(self):
+        """Test splitting placeholders into name and documentation."""
+        variables = self.debugger._analyze_variables(
+            "{{ hero }} {{place # where it happens}} {{mood # calm # ignored}}",
+        )
+
+        assert [
+            (var["name"], var["has_documentation"], var["documentation"])
+            for var in variables
+        ] == [
+            ("hero", False, None),
+            ("place", True, "where it happens"),
+            ("mood", True, "calm"),
+        ]
+
+    def test_template_size_bytes_counts_utf8(self):
+        """Test that non-ASCII templates report their encoded size."""
+        metrics = self.debugger._calculate_performance_metrics("Café {{name}}", [], 1)
+
+        assert metrics.template_size_chars == 13
+        assert metrics.template_size_bytes == 14
@@ -1,7 +1,8 @@
 """Tests for the template loader service."""
 
+import os
 from pathlib import Path
-from unittest.mock import mock_open, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -30,7 +31,7 @@ class TestTemplateLoader:
         # Mock template content
         template_content = "Hello {{name}}, welcome to {{place}}!"
 
-        with patch("builtins.open", mock_open(read_data=template_content)):
+        with patch.object(Path, "read_text", return_value=template_content):
             with patch.object(Path, "exists", return_value=True):
                 result = loader.load_template("test_template.txt")
                 assert result == template_content
@@ -202,7 +203,7 @@ class TestTemplateLoader:
 
         template_content = "Hello {{name}}!"
 
-        with patch("builtins.open", mock_open(read_data=template_content)):
+        with patch.object(Path, "read_text", return_value=template_content):
             with patch.object(Path, "exists", return_value=True):
                 # First load
                 result1 = loader.load_template("test.txt")
@@ -214,3 +215,231 @@ class TestTemplateLoader:
                 # Check that the full path is in the cache, not just the filename
                 cache_key = str(loader.templates_dir / "test.txt")
                 assert cache_key in loader._template_cache
+
+    def test_render_template_caches_output(self):
+        """Test that repeated renders with the same context reuse the output."""
+        loader = TemplateLoader()
+
+        with patch.object(
+            loader,
+            "load_template",
+            return_value="Hello {{name}}!",
+        ) as mock_load:
+            result1 = loader.render_template("test.txt", {"name": "Alice"})
+            result2 = loader.render_template("test.txt", {"name": "Alice"})
+            result3 = loader.render_template("test.txt", {"name": "Bob"})
+
+        assert result1 == result2 == "Hello Alice!"
+        assert result3 == "Hello Bob!"
+        assert mock_load.call_count == 2
+
+        loader.clear_cache()
+        assert len(loader._render_cache) == 0
+
+    def test_invalidate_template_drops_one_template(self):
+        """Test that invalidating a template leaves other cached entries alone."""
+        loader = TemplateLoader()
+
+        with patch.object(loader, "load_template", return_value="Hi {{name}}"):
+            loader.render_template("a.txt", {"name": "Alice"})
+            loader.render_template("b.txt", {"name": "Alice"})
+        loader._template_cache[str(loader.templates_dir / "a.txt")] = "Hi {{name}}"
+
+        loader.invalidate_template("a.txt")
+
+        assert str(loader.templates_dir / "a.txt") not in loader._template_cache
+        assert [key[0] for key in loader._render_cache] == ["b.txt"]
+
+    def test_render_template_unhashable_context(self):
+        """Test that contexts with unhashable values are cached by their text."""
+        loader = TemplateLoader()
+
+        with patch.object(loader, "load_template", return_value="{{items}}"):
+            result = loader.render_template("test.txt", {"items": ["a", "b"]})
+
+        assert result == "['a', 'b']"
+        assert len(loader._render_cache) == 1
+
+    def test_render_template_mixed_key_context(self):
+        """Test that contexts that cannot be keyed still render, uncached."""
+        loader = TemplateLoader()
+
+        class Unprintable:
+            def __str__(self):
+                raise RuntimeError("no text form")
+
+        with patch.object(loader, "load_template", return_value="Hi {{name}}"):
+            assert loader.render_template("t.txt", {"name": "x", 1: "y"}) == "Hi x"
+            assert (
+                loader.render_template("t.txt", {"name": "x", "o": Unprintable()})
+                == "Hi x"
+            )
+
+        assert len(loader._render_cache) == 0
+
+    def test_render_template_cache_distinguishes_equal_values(self):
+        """Test that values which compare equal but render differently never collide."""
+        loader = TemplateLoader()
+
+        with patch.object(loader, "load_template", return_value="Count: {{n}}"):
+            results = [
+                loader.render_template("test.txt", {"n": value})
+                for value in (1, True, 1.0)
+            ]
+
+        assert results == ["Count: 1", "Count: True", "Count: 1.0"]
+
+    def test_render_template_missing_variable_warns_every_time(self):
+        """Test that renders with missing variables are not served from cache."""
+        loader = TemplateLoader()
+
+        with (
+            patch.object(loader, "load_template", return_value="Hi {{name}}"),
+            patch("jestir.services.template_loader.logger") as mock_logger,
+        ):
+            loader.render_template("test.txt", {})
+            loader.render_template("test.txt", {})
+
+        assert mock_logger.warning.call_count == 2
+        assert len(loader._render_cache) == 0
+
+    def test_render_template_failure_records_size_without_reload(self):
+        """Test that a failed render reports the size of the loaded template."""
+        loader = TemplateLoader()
+
+        with (
+            patch.object(
+                loader,
+                "load_template",
+                return_value="Hello {{name}}!",
+            ) as mock_load,
+            patch.object(
+                loader,
+                "_substitute_variables",
+                side_effect=ValueError("boom"),
+            ),
+            patch.object(loader, "_record_template_metrics") as mock_record,
+        ):
+            with pytest.raises(ValueError, match="boom"):
+                loader.render_template("test.txt", {"name": "Alice"})
+
+        mock_load.assert_called_once_with("test.txt")
+        args, kwargs = mock_record.call_args
+        assert args[2] == len("Hello {{name}}!")
+        assert kwargs["success"] is False
+        assert kwargs["error_type"] == "ValueError"
+
+    def test_cached_template_skips_exists_check(self):
+        """Test that cache hits do not touch the filesystem."""
+        loader = TemplateLoader()
+        cache_key = str(loader.templates_dir / "test.txt")
+        loader._template_cache[cache_key] = "cached content"
+
+        with patch.object(Path, "exists", return_value=False) as mock_exists:
+            assert loader.load_template("test.txt") == "cached content"
+
+        mock_exists.assert_not_called()
+
+    def test_render_many(self):
+        """Test rendering several templates against one context."""
+        loader = TemplateLoader()
+        templates = {
+            "a.txt": "Hello {{name # hero}}!",
+            "b.txt": "{{name}} is {{age}}; {{missing}}{{nothing}}",
+        }
+        context = {"name": "Alice", "age": 7, "nothing": None}
+
+        with patch.object(loader, "load_template", side_effect=templates.get):
+            result = loader.render_many(["a.txt", "b.txt"], context)
+
+        assert result == ["Hello Alice!", "Alice is 7; {{missing}}"]
+
+    def test_render_many_stringifies_context_once(self):
+        """Test that shared context values are converted once per batch."""
+        loader = TemplateLoader()
+
+        class Counted:
+            calls = 0
+
+            def __str__(self):
+                Counted.calls += 1
+                return "x"
+
+        with patch.object(loader, "load_template", return_value="{{v}}{{v}}"):
+            result = loader.render_many(["a.txt", "b.txt", "c.txt"], {"v": Counted()})
+
+        assert result == ["xx", "xx", "xx"]
+        assert Counted.calls == 1
+
+    def test_simple_templates_use_format_map(self):
+        """Test that bare placeholders render via a cached format string."""
+        loader = TemplateLoader()
+        template = "{literal} {{name}} has {{count}} {{missing}}{{empty}} }"
+
+        result = loader._substitute_variables(
+            template,
+            {"name": "Alice", "count": 3, "empty": None},
+        )
+
+        assert result == "{literal} Alice has 3 {{missing}} }"
+        assert loader._format_cache[template] == (
+            "{{literal}} {name} has {count} {missing}{empty} }}"
+        )
+
+    def test_documented_templates_skip_format_map(self):
+        """Test that placeholders str.format would misread use the regex path."""
+        loader = TemplateLoader()
+        context = {"name": "Alice", "author.name": "Bo"}
+
+        for template in ("{{name # hero}}", "{{ name }}", "{{author.name}}"):
+            result = loader._substitute_variables(template, context)
+
+            assert loader._format_cache[template] is None
+            assert result in {"Alice", "Bo"}
+
+    def test_get_available_templates_cached_until_directory_changes(
+        self,
+        tmp_path,
+    ):
+        """Test that the template listing is rescanned only after changes."""
+        system_dir = tmp_path / "prompts" / "system_prompts"
+        system_dir.mkdir(parents=True)
+        (system_dir / "story.txt").write_text("story", encoding="utf-8")
+        loader = TemplateLoader(str(tmp_path))
+
+        first = loader.get_available_templates()
+        first["system_prompts"].append("mutated")
+
+        with patch("jestir.services.template_loader.os.scandir") as mock_scandir:
+            second = loader.get_available_templates()
+        mock_scandir.assert_not_called()
+        assert second == {
+            "system_prompts": ["story"],
+            "user_prompts": [],
+            "includes": [],
+        }
+
+        (system_dir / "outline.txt").write_text("outline", encoding="utf-8")
+        stat = system_dir.stat()
+        os.utime(system_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        third = loader.get_available_templates()
+        assert sorted(third["system_prompts"]) == ["outline", "story"]
+
+    def test_static_template_returned_unchanged(self):
+        """Test that templates without placeholders skip substitution."""
+        loader = TemplateLoader()
+        template = "A static {prompt} with no variables."
+
+        assert loader._substitute_variables(template, {"prompt": "x"}) is template
+        assert len(loader._format_cache) == 0
+
+    def test_validate_template_syntax_line_count(self):
+        """Test that line counts match str.splitlines for newline-only text."""
+        loader = TemplateLoader()
+
+        for content in ("", "one", "one\n", "one\ntwo", "one\n\ntwo\n", "\n\n"):
+            with patch.object(loader, "load_template", return_value=content):
+                result = loader.validate_template_syntax("test.txt")
+
+            assert result["line_count"] == len(content.splitlines())
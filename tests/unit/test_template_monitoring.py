@@ -60,6 +60,22 @@ class TestTemplateMonitor:
         assert self.monitor.metrics_history[0].success is False
         assert self.monitor.error_counts["FileNotFoundError"] == 1
 
+    def test_metrics_template_name(self):
+        """Test that metrics are grouped by the template's file name."""
+        metrics = TemplateMetrics(
+            template_path="prompts/user_prompts/story.txt",
+            processing_time_ms=10.0,
+            template_size_bytes=100,
+            variable_count=1,
+            success=True,
+        )
+
+        self.monitor.record_metrics(metrics)
+
+        assert metrics.template_name == "story.txt"
+        performance = self.monitor.get_template_performance("other/dir/story.txt")
+        assert performance["total_metrics"] == 1
+
     def test_performance_summary_no_data(self):
         """Test performance summary with no data."""
         summary = self.monitor.get_performance_summary()
@@ -204,6 +220,45 @@ class TestTemplateMonitor:
         assert error_analysis["failed_metrics"] == 2
         assert "FileNotFoundError" in error_analysis["most_common_errors"][0][0]
 
+    def test_error_analysis_forgets_errors_outside_window(self):
+        """Test that error histograms only cover the most recent metrics."""
+        for error_type in ["KeyError"] * 3 + ["ValueError"] * 2:
+            self.monitor.record_metrics(
+                TemplateMetrics(
+                    template_path=f"{error_type}.txt",
+                    processing_time_ms=50.0,
+                    template_size_bytes=500,
+                    variable_count=3,
+                    success=False,
+                    error_type=error_type,
+                ),
+            )
+        for _ in range(97):
+            self.monitor.record_metrics(
+                TemplateMetrics(
+                    template_path="fine.txt",
+                    processing_time_ms=50.0,
+                    template_size_bytes=500,
+                    variable_count=3,
+                    success=True,
+                ),
+            )
+
+        error_analysis = self.monitor.get_error_analysis()
+
+        assert error_analysis["total_metrics"] == 100
+        assert error_analysis["failed_metrics"] == 3
+        assert error_analysis["most_common_errors"] == [
+            ("ValueError", 2),
+            ("KeyError", 1),
+        ]
+        assert error_analysis["most_problematic_templates"] == [
+            ("ValueError.txt", 2),
+            ("KeyError.txt", 1),
+        ]
+        assert "KeyError" in self.monitor._recent_error_types
+        assert self.monitor.error_counts["KeyError"] == 3
+
     def test_memory_usage_analysis(self):
         """Test memory usage analysis."""
         # Record metrics with various template sizes
@@ -317,6 +372,109 @@ class TestTemplateMonitor:
         assert small_monitor.metrics_history[0].template_path == "template_2.txt"
         assert small_monitor.metrics_history[-1].template_path == "template_4.txt"
 
+    def test_error_rate_tracks_recent_window(self):
+        """Test that the error rate only counts the last 100 metrics."""
+        for success in [False] * 10 + [True] * 100:
+            self.monitor.record_metrics(
+                TemplateMetrics(
+                    template_path="test_template.txt",
+                    processing_time_ms=10.0,
+                    template_size_bytes=100,
+                    variable_count=1,
+                    success=success,
+                ),
+            )
+            window = list(self.monitor.metrics_history)[-100:]
+            expected = sum(not m.success for m in window) / len(window)
+            assert self.monitor._error_rates["test_template.txt"] == expected
+
+        assert self.monitor._error_rates["test_template.txt"] == 0.0
+
+    def test_per_template_history_is_bounded(self):
+        """Test that per-template series keep only the newest 100 entries."""
+        for i in range(150):
+            self.monitor.record_metrics(
+                TemplateMetrics(
+                    template_path="test_template.txt",
+                    processing_time_ms=float(i),
+                    template_size_bytes=i,
+                    variable_count=1,
+                    success=True,
+                ),
+            )
+
+        times = self.monitor._processing_times["test_template.txt"]
+        sizes = self.monitor._template_sizes["test_template.txt"]
+        assert list(times) == [float(i) for i in range(50, 150)]
+        assert list(sizes) == list(range(50, 150))
+        performance = self.monitor.get_template_performance("test_template.txt")
+        assert performance["performance_trend"] == "degrading"
+
+    def test_zero_history_records_without_error(self):
+        """Test that a monitor keeping no history still accepts metrics."""
+        monitor = TemplateMonitor(max_history=0)
+
+        monitor.record_metrics(
+            TemplateMetrics(
+                template_path="a.txt",
+                processing_time_ms=10.0,
+                template_size_bytes=100,
+                variable_count=1,
+                success=False,
+                error_type="ValueError",
+            ),
+        )
+
+        assert len(monitor.metrics_history) == 0
+        assert monitor.get_template_performance("a.txt")["status"] == "no_data"
+        assert monitor.get_error_analysis()["status"] == "no_data"
+
+    def test_template_performance_ignores_evicted_metrics(self):
+        """Test that per-template stats only cover metrics still in history."""
+        small_monitor = TemplateMonitor(max_history=3)
+
+        for path, success in [
+            ("a.txt", False),
+            ("b.txt", True),
+            ("a.txt", True),
+            ("b.txt", True),
+        ]:
+            small_monitor.record_metrics(
+                TemplateMetrics(
+                    template_path=path,
+                    processing_time_ms=10.0,
+                    template_size_bytes=100,
+                    variable_count=1,
+                    success=success,
+                ),
+            )
+
+        performance = small_monitor.get_template_performance("a.txt")
+        assert performance["total_metrics"] == 1
+        assert performance["success_rate"] == 1.0
+
+        small_monitor.record_metrics(
+            TemplateMetrics(
+                template_path="b.txt",
+                processing_time_ms=10.0,
+                template_size_bytes=100,
+                variable_count=1,
+                success=True,
+            ),
+        )
+        small_monitor.record_metrics(
+            TemplateMetrics(
+                template_path="b.txt",
+                processing_time_ms=10.0,
+                template_size_bytes=100,
+                variable_count=1,
+                success=True,
+            ),
+        )
+
+        assert small_monitor.get_template_performance("a.txt")["status"] == "no_data"
+        assert "a.txt" not in small_monitor._template_metrics
+
     def test_performance_trends(self):
         """Test performance trend calculation."""
         # Record metrics with improving performance (need at least 20 for trend calculation)
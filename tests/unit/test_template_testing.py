@@ -128,6 +128,25 @@ class TestTemplateSyntaxValidation:
         finally:
             os.unlink(template_path)
 
+    def test_single_brace_typo_warning(self):
+        """Test that single braces are flagged only when no {{ }} appear."""
+        loader = TemplateLoader()
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+            f.write("Hello {name}! This is a story.")
+            template_path = f.name
+
+        try:
+            result = loader.validate_template_syntax(template_path)
+
+            assert result["warnings"] == [
+                "Possible typo: '{' should be '{{'",
+                "Possible typo: '}' should be '}}'",
+            ]
+
+        finally:
+            os.unlink(template_path)
+
     def test_empty_variable_name(self):
         """Test detection of empty variable names."""
         loader = TemplateLoader()